@@ -1,21 +1,28 @@
-from fastapi import Depends, HTTPException, status
+import math
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import jwt
 from jwt import PyJWTError
 
 from app.db.session import get_db
 from app.core.config import settings
+from app.core.profiling import is_admin_token
+from app.core.rate_limit import rate_limiter
 from app.models.user import User
+from app.services.principal_cache import CurrentUser, principal_cache
 
 security = HTTPBearer()
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_db)
+) -> CurrentUser:
     """
-    Validate JWT token and return current user
+    Validate JWT token and return a snapshot of the current user
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -23,25 +30,83 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(
-            token, 
-            settings.SECRET_KEY, 
-            algorithms=[settings.ALGORITHM]
-        )
-        user_id: int = payload.get("sub")
-        
-        if user_id is None:
+    token = credentials.credentials
+    user_id = principal_cache.get_token_subject(token)
+    
+    if user_id is None:
+        try:
+            payload = jwt.decode(
+                token, 
+                settings.SECRET_KEY, 
+                algorithms=[settings.ALGORITHM]
+            )
+            user_id = int(payload.get("sub"))
+        except (PyJWTError, TypeError, ValueError):
             raise credentials_exception
-            
-    except PyJWTError:
-        raise credentials_exception
+        
+        principal_cache.remember_token(token, user_id, payload.get("exp"))
+    
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
     
-    user = db.query(User).filter(User.id == user_id).first()
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
     
     if user is None:
         raise credentials_exception
-        
-    return user
+    
+    principal = CurrentUser.from_user(user)
+    principal_cache.set(principal)
+    return principal
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Allow only callers presenting PROFILING_ADMIN_TOKEN
+    """
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin token required"
+        )
 
+def get_client_ip(request: Request) -> str:
+    """
+    Client address, looking through RATE_LIMIT_TRUSTED_PROXIES proxy hops
+    """
+    hops = settings.RATE_LIMIT_TRUSTED_PROXIES
+    forwarded = request.headers.get("x-forwarded-for")
+    if hops > 0 and forwarded:
+        addresses = [a.strip() for a in forwarded.split(",") if a.strip()]
+        if addresses:
+            # Entries left of the last `hops` ones can be forged by the client
+            return addresses[max(len(addresses) - hops, 0)]
+    
+    return request.client.host if request.client else "unknown"
+
+async def _enforce_rate_limit(response: Response, scope: str, key: str, per_minute: int) -> None:
+    result = await rate_limiter.hit(scope, key, per_minute)
+    if not result.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded, please slow down",
+            headers={"Retry-After": str(max(math.ceil(result.retry_after), 1))}
+        )
+    
+    response.headers["X-RateLimit-Limit"] = str(per_minute)
+    response.headers["X-RateLimit-Remaining"] = str(result.remaining)
+
+async def guest_rate_limit(request: Request, response: Response) -> None:
+    """
+    Per-IP budget for unauthenticated (guest) LLM requests
+    """
+    await _enforce_rate_limit(response, "guest", get_client_ip(request), settings.GUEST_RATE_LIMIT_PER_MINUTE)
+
+async def user_rate_limit(
+    response: Response,
+    current_user: CurrentUser = Depends(get_current_user)
+) -> None:
+    """
+    Per-user budget for authenticated LLM requests
+    """
+    await _enforce_rate_limit(response, "user", str(current_user.id), settings.RATE_LIMIT_PER_MINUTE)
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.api.deps import require_admin
+from app.core.profiling import profile_store
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/profiles")
+async def list_profiles():
+    """List captured request profiles, newest first"""
+    return {"profiles": profile_store.list()}
+
+@router.get("/profiles/{name}")
+async def download_profile(name: str):
+    """Download a profile (pstats format, e.g. for snakeviz or `python -m pstats`)"""
+    path = profile_store.path(name)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
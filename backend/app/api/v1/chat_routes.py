@@ -1,12 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import datetime
 
 from app.db.session import get_db
 from app.api.deps import get_current_user
-from app.models.user import User
+from app.core.config import settings
+from app.services.principal_cache import CurrentUser
 from app.models.chat import Chat
+from app.models.message import Message
+from app.utils.pagination import InvalidCursorError, KeysetPage, keyset_page
+from app.services import search_service
 from app.schemas.chat import (
     ChatCreate,
     ChatResponse,
@@ -15,39 +20,64 @@ from app.schemas.chat import (
     ChatUpdate,
     MessageInChat
 )
+from app.schemas.search import MessageSearchHit, MessageSearchResponse
 
 router = APIRouter()
 
+
+def _page_size(limit: Optional[int], before: Optional[str], after: Optional[str]) -> Optional[int]:
+    """Page size for a list request, or None for the legacy unpaginated response"""
+    if limit is None and before is None and after is None and settings.LEGACY_UNPAGINATED_LISTS:
+        return None
+    return limit or settings.DEFAULT_PAGE_SIZE
+
+
+async def _keyset_page(db, statement, timestamp_column, id_column, key, limit, before, after) -> KeysetPage:
+    try:
+        return await keyset_page(db, statement, timestamp_column, id_column, key, limit, before, after)
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
 @router.get("", response_model=ChatListResponse)
 async def get_chats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_SIZE, description="Page size"),
+    before: Optional[str] = Query(None, description="Cursor: return chats older than this"),
+    after: Optional[str] = Query(None, description="Cursor: return chats newer than this"),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all chats for current user"""
-    chats = db.query(Chat).filter(
-        Chat.user_id == current_user.id
-    ).order_by(Chat.updated_at.desc()).all()
-    
-    # Add message count to each chat
-    chat_responses = []
-    for chat in chats:
-        chat_dict = {
-            "id": chat.id,
-            "user_id": chat.user_id,
-            "title": chat.title,
-            "created_at": chat.created_at,
-            "updated_at": chat.updated_at,
-            "message_count": len(chat.messages)
-        }
-        chat_responses.append(ChatResponse(**chat_dict))
+    """Get chats for current user, most recently updated first"""
+    statement = select(Chat).where(Chat.user_id == current_user.id)
+    
+    page_size = _page_size(limit, before, after)
+    if page_size is None:
+        result = await db.execute(statement.order_by(Chat.updated_at.desc(), Chat.id.desc()))
+        chats = result.scalars().all()
+        
+        # Message count and preview come from the chat row itself
+        return ChatListResponse(chats=[ChatResponse.model_validate(chat) for chat in chats])
+    
+    page = await _keyset_page(
+        db, statement, Chat.updated_at, Chat.id,
+        lambda chat: (chat.updated_at, chat.id),
+        page_size, before, after
+    )
     
-    return ChatListResponse(chats=chat_responses)
+    return ChatListResponse(
+        chats=[ChatResponse.model_validate(chat) for chat in page.items],
+        next_cursor=page.next_cursor,
+        prev_cursor=page.prev_cursor
+    )
 
 @router.post("", response_model=ChatResponse, status_code=status.HTTP_201_CREATED)
 async def create_chat(
     chat_data: ChatCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     chat = Chat(
         user_id=current_user.id,
@@ -55,29 +85,26 @@ async def create_chat(
     )
     
     db.add(chat)
-    db.commit()
-    db.refresh(chat)
+    await db.commit()
+    await db.refresh(chat)
     
-    return ChatResponse(
-        id=chat.id,
-        user_id=chat.user_id,
-        title=chat.title,
-        created_at=chat.created_at,
-        updated_at=chat.updated_at,
-        message_count=0
-    )
+    return ChatResponse.model_validate(chat)
 
 @router.get("/{chat_id}", response_model=ChatWithMessages)
 async def get_chat(
     chat_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_SIZE, description="Page size"),
+    before: Optional[str] = Query(None, description="Cursor: return messages older than this"),
+    after: Optional[str] = Query(None, description="Cursor: return messages newer than this"),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific chat with messages"""
-    chat = db.query(Chat).filter(
+    result = await db.execute(select(Chat).where(
         Chat.id == chat_id,
         Chat.user_id == current_user.id
-    ).first()
+    ))
+    chat = result.scalar_one_or_none()
     
     if not chat:
         raise HTTPException(
@@ -85,8 +112,26 @@ async def get_chat(
             detail="Chat not found"
         )
     
+    next_cursor = prev_cursor = None
+    messages_statement = select(Message).where(Message.chat_id == chat.id)
+    
+    page_size = _page_size(limit, before, after)
+    if page_size is None:
+        result = await db.execute(messages_statement.order_by(Message.created_at, Message.id))
+        db_messages = result.scalars().all()
+    else:
+        page = await _keyset_page(
+            db, messages_statement,
+            Message.created_at, Message.id,
+            lambda msg: (msg.created_at, msg.id),
+            page_size, before, after
+        )
+        # Pages are fetched newest first but returned in conversation order
+        db_messages = list(reversed(page.items))
+        next_cursor, prev_cursor = page.next_cursor, page.prev_cursor
+    
     # Prepare messages
-    messages = [MessageInChat.from_orm(msg) for msg in chat.messages]
+    messages = [MessageInChat.model_validate(msg) for msg in db_messages]
     
     return ChatWithMessages(
         id=chat.id,
@@ -94,21 +139,25 @@ async def get_chat(
         title=chat.title,
         created_at=chat.created_at,
         updated_at=chat.updated_at,
-        message_count=len(messages),
-        messages=messages
+        message_count=chat.message_count,
+        last_message_preview=chat.last_message_preview,
+        messages=messages,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor
     )
 
 @router.delete("/{chat_id}", status_code=status.HTTP_200_OK)
 async def delete_chat(
     chat_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a chat"""
-    chat = db.query(Chat).filter(
+    result = await db.execute(select(Chat).where(
         Chat.id == chat_id,
         Chat.user_id == current_user.id
-    ).first()
+    ))
+    chat = result.scalar_one_or_none()
     
     if not chat:
         raise HTTPException(
@@ -116,8 +165,8 @@ async def delete_chat(
             detail="Chat not found"
         )
     
-    db.delete(chat)
-    db.commit()
+    await db.delete(chat)
+    await db.commit()
     
     return {"message": "Chat deleted successfully"}
 
@@ -125,14 +174,15 @@ async def delete_chat(
 async def update_chat_title(
     chat_id: int,
     chat_update: ChatUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update chat title"""
-    chat = db.query(Chat).filter(
+    result = await db.execute(select(Chat).where(
         Chat.id == chat_id,
         Chat.user_id == current_user.id
-    ).first()
+    ))
+    chat = result.scalar_one_or_none()
     
     if not chat:
         raise HTTPException(
@@ -143,43 +193,51 @@ async def update_chat_title(
     chat.title = chat_update.title
     chat.updated_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(chat)
+    await db.commit()
+    await db.refresh(chat)
     
-    return ChatResponse(
-        id=chat.id,
-        user_id=chat.user_id,
-        title=chat.title,
-        created_at=chat.created_at,
-        updated_at=chat.updated_at,
-        message_count=len(chat.messages)
-    )
+    return ChatResponse.model_validate(chat)
 
 @router.get("/search/chats", response_model=ChatListResponse)
 async def search_chats(
     q: Optional[str] = Query(None, description="Search query"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    limit: int = Query(50, ge=1, le=settings.MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Search chats by title"""
+    """Search chats by title and message content, most relevant first"""
     if not q:
         return ChatListResponse(chats=[])
     
-    chats = db.query(Chat).filter(
-        Chat.user_id == current_user.id,
-        Chat.title.ilike(f"%{q}%")
-    ).order_by(Chat.updated_at.desc()).all()
-    
-    chat_responses = []
-    for chat in chats:
-        chat_dict = {
-            "id": chat.id,
-            "user_id": chat.user_id,
-            "title": chat.title,
-            "created_at": chat.created_at,
-            "updated_at": chat.updated_at,
-            "message_count": len(chat.messages)
-        }
-        chat_responses.append(ChatResponse(**chat_dict))
-    
-    return ChatListResponse(chats=chat_responses)
\ No newline at end of file
+    try:
+        chat_ids = await search_service.search_chat_ids(db, current_user.id, q, limit, offset)
+    except search_service.SearchNotSupported as e:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(e))
+    if not chat_ids:
+        return ChatListResponse(chats=[])
+    
+    result = await db.execute(select(Chat).where(Chat.id.in_(chat_ids)))
+    chats = {chat.id: chat for chat in result.scalars()}
+    chat_responses = [ChatResponse.model_validate(chats[chat_id]) for chat_id in chat_ids if chat_id in chats]
+    
+    return ChatListResponse(chats=chat_responses)
+
+@router.get("/search/messages", response_model=MessageSearchResponse)
+async def search_messages(
+    q: str = Query(..., min_length=1, description="Search query"),
+    limit: int = Query(20, ge=1, le=settings.MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Full-text search across the user's messages with highlighted snippets"""
+    try:
+        hits = await search_service.search_messages(db, current_user.id, q, limit + 1, offset)
+    except search_service.SearchNotSupported as e:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(e))
+    
+    return MessageSearchResponse(
+        results=[MessageSearchHit(**hit) for hit in hits[:limit]],
+        next_offset=offset + limit if len(hits) > limit else None
+    )
@@ -1,14 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
+from typing import Optional
+import anyio
+import json
 
 from app.db.session import get_db
-from app.api.deps import get_current_user
-from app.models.user import User
+from app.core.admission import AdmissionRejected, Priority, admission_controller
+from app.api.deps import get_current_user, guest_rate_limit, user_rate_limit
+from app.services.principal_cache import CurrentUser
 from app.models.chat import Chat
 from app.models.message import Message
 from app.schemas.message import MessageCreate, MessagePairResponse, MessageResponse
-from app.services.chatbot_service import get_ai_response
+from app.services.chatbot_service import get_ai_response, get_cached_ai_response, stream_ai_response
+from app.services.conversation_service import fetch_context_window
+from app.services.summary_service import build_system_prompt, summary_keep_recent, update_chat_summary
 from app.utils.context_manager import ConversationContextManager
 from app.core.logging import logger
 from app.core.config import settings
@@ -16,10 +24,14 @@ from app.core.config import settings
 router = APIRouter()
 
 # ✅ NEW: Guest endpoint (add this at the top, before authenticated routes)
-@router.post("/guest/message", response_model=MessagePairResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/guest/message",
+    response_model=MessagePairResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(guest_rate_limit)]
+)
 async def send_guest_message(
-    message_data: MessageCreate,
-    db: Session = Depends(get_db)
+    message_data: MessageCreate
 ):
     """Send a message as guest and get AI response (no persistence)"""
     
@@ -35,8 +47,8 @@ async def send_guest_message(
     )
     
     try:
-        # Get AI response
-        ai_content = await get_ai_response(conversation_history)
+        # Get AI response (identical guest prompts are served from cache)
+        ai_content = await get_cached_ai_response(conversation_history)
         
         logger.info(f"Guest message processed successfully")
         
@@ -58,6 +70,9 @@ async def send_guest_message(
             }
         }
         
+    except AdmissionRejected:
+        raise
+        
     except Exception as e:
         logger.error(f"Guest message failed: {str(e)}")
         raise HTTPException(
@@ -65,21 +80,13 @@ async def send_guest_message(
             detail=f"Failed to get AI response: {str(e)}"
         )
 
-# Existing authenticated endpoint
-@router.post("/{chat_id}/messages", response_model=MessagePairResponse, status_code=status.HTTP_201_CREATED)
-async def send_message(
-    chat_id: int,
-    message_data: MessageCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Send a message and get AI response"""
-    
-    # Verify chat exists and belongs to user
-    chat = db.query(Chat).filter(
+async def _get_user_chat(db: AsyncSession, chat_id: int, user_id: int) -> Chat:
+    """Fetch a chat owned by the user or raise 404"""
+    result = await db.execute(select(Chat).where(
         Chat.id == chat_id,
-        Chat.user_id == current_user.id
-    ).first()
+        Chat.user_id == user_id
+    ))
+    chat = result.scalar_one_or_none()
     
     if not chat:
         raise HTTPException(
@@ -87,75 +94,220 @@ async def send_message(
             detail="Chat not found"
         )
     
-    # Create user message
+    return chat
+
+
+async def _prepare_exchange(db: AsyncSession, chat: Chat, content: str):
+    """
+    Build the user message and the conversation sent to the AI
+    
+    Nothing is written here: the user message is inserted together with the
+    reply by _complete_exchange, and the read transaction is ended before
+    returning, so no connection or SQLite write lock is held during the LLM call.
+    
+    Returns:
+        Tuple of (user_message, is_first_message, conversation_history, keep_recent),
+        where keep_recent is set when older turns are due to be summarized
+        (see summary_keep_recent)
+    """
+    is_first_message = chat.message_count == 0
+    
+    # Create user message (added to the session once the reply is in)
     user_message = Message(
-        chat_id=chat_id,
+        chat_id=chat.id,
         role="user",
-        content=message_data.content
+        content=content,
+        created_at=datetime.utcnow()
     )
-    db.add(user_message)
-    db.flush()  # Flush to get the message ID
     
-    # Get conversation history from database
-    db_messages = db.query(Message).filter(
-        Message.chat_id == chat_id
-    ).order_by(Message.created_at).all()
+    # Fetch only the newest turns the summary doesn't cover; the new message
+    # takes one of the MAX_CONTEXT_MESSAGES slots
+    window = await fetch_context_window(
+        db, chat.id, settings.MAX_CONTEXT_MESSAGES - 1, after_id=chat.summary_message_id
+    )
+    window.append({"role": "user", "content": content, "token_count": None})
     
-    # Use ConversationContextManager to prepare messages
-    conversation_history = ConversationContextManager.prepare_messages(db_messages)
+    # Release the connection; `chat` stays loaded (expire_on_commit=False)
+    await db.commit()
     
-    # Add system prompt for better AI behavior
-    conversation_history = ConversationContextManager.add_system_message(
-        conversation_history, 
-        settings.SYSTEM_PROMPT
+    # Pack the newest messages into the token budget, behind the system prompt
+    # (which carries the rolling summary of older turns on long chats)
+    conversation_history, estimated_tokens = ConversationContextManager.build_budgeted_context(
+        window,
+        build_system_prompt(chat.summary),
+        token_budget=settings.CONTEXT_TOKEN_BUDGET,
+        reserved_output_tokens=settings.MAX_TOKENS
     )
     
-    # ✅ Truncate to prevent token limit errors
-    conversation_history = ConversationContextManager.truncate_context(
-        conversation_history, 
-        settings.MAX_CONTEXT_MESSAGES
+    # ✅ Log token estimation for monitoring
+    logger.info(f"Chat {chat.id}: Sending ~{estimated_tokens} tokens to AI")
+    
+    keep_recent = summary_keep_recent(len(window), len(conversation_history) - 1)
+    
+    return user_message, is_first_message, conversation_history, keep_recent
+
+
+async def _complete_exchange(
+    db: AsyncSession,
+    chat: Chat,
+    user_message: Message,
+    is_first_message: bool,
+    ai_content: str,
+    background_tasks: BackgroundTasks,
+    keep_recent: Optional[int] = None
+) -> MessagePairResponse:
+    """Persist the message pair, update the chat and commit"""
+    db.add(user_message)
+    
+    # Create assistant message
+    assistant_message = Message(
+        chat_id=chat.id,
+        role="assistant",
+        content=ai_content
     )
+    db.add(assistant_message)
     
-    # ✅ Log token estimation for monitoring
-    estimated_tokens = ConversationContextManager.estimate_tokens(conversation_history)
-    logger.info(f"Chat {chat_id}: Sending ~{estimated_tokens} tokens to AI")
+    if is_first_message:
+       title = user_message.content[:50] + ('...' if len(user_message.content) > 50 else '')
+       chat.title = title
+       logger.info(f"Chat {chat.id}: Auto-generated title: {title}")
+
+    # Update chat timestamp
+    chat.updated_at = datetime.utcnow()
     
-    try:
-        # Get AI response
-        ai_content = await get_ai_response(conversation_history)
+    await db.commit()
+    # Message counters are maintained in SQL by the Message insert events
+    await db.refresh(chat, ["message_count"])
+    
+    logger.info(f"Chat {chat.id}: Message exchange completed successfully")
+    
+    # Condense older turns after the response is sent
+    if keep_recent is not None:
+        background_tasks.add_task(update_chat_summary, chat.id, keep_recent)
+    
+    return MessagePairResponse(
+        user_message=MessageResponse.model_validate(user_message),
+        assistant_message=MessageResponse.model_validate(assistant_message)
+    )
+
+
+def _sse_event(event: str, data: str) -> str:
+    """Format a Server-Sent Event"""
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+# Existing authenticated endpoint
+@router.post(
+    "/{chat_id}/messages",
+    response_model=MessagePairResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(user_rate_limit)]
+)
+async def send_message(
+    chat_id: int,
+    message_data: MessageCreate,
+    background_tasks: BackgroundTasks,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Send a message and get AI response"""
+    
+    # Wait for an LLM slot first; sheds with 503 when the queue is full or too slow
+    async with admission_controller.slot(Priority.INTERACTIVE):
+        # Verify chat exists and belongs to user
+        chat = await _get_user_chat(db, chat_id, current_user.id)
         
-        # Create assistant message
-        assistant_message = Message(
-            chat_id=chat_id,
-            role="assistant",
-            content=ai_content
+        user_message, is_first_message, conversation_history, keep_recent = await _prepare_exchange(
+            db, chat, message_data.content
         )
-        db.add(assistant_message)
         
-        if len(db_messages) == 1:
-           title = message_data.content[:50] + ('...' if len(message_data.content) > 50 else '')
-           chat.title = title
-           logger.info(f"Chat {chat_id}: Auto-generated title: {title}")
+        try:
+            # Get AI response
+            ai_content = await get_ai_response(conversation_history)
+            
+            return await _complete_exchange(
+                db, chat, user_message, is_first_message, ai_content, background_tasks, keep_recent
+            )
+            
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Chat {chat_id}: Failed to get AI response - {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get AI response: {str(e)}"
+            )
 
-        # Update chat timestamp
-        chat.updated_at = datetime.utcnow()
-        
-        db.commit()
-        db.refresh(user_message)
-        db.refresh(assistant_message)
-        
-        logger.info(f"Chat {chat_id}: Message exchange completed successfully")
-        
-        return MessagePairResponse(
-            user_message=MessageResponse.from_orm(user_message),
-            assistant_message=MessageResponse.from_orm(assistant_message)
-        )
+
+@router.post("/{chat_id}/messages/stream", dependencies=[Depends(user_rate_limit)])
+async def stream_message(
+    chat_id: int,
+    message_data: MessageCreate,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Send a message and stream the AI response as Server-Sent Events
+    
+    Emits `chunk` events with `{"content": ...}` as the model generates text,
+    then a single `done` event carrying the persisted message pair, or an
+    `error` event if generation fails. Nothing is persisted if the client
+    disconnects before the stream completes.
+    """
+    
+    # Admit before the response starts so overload is a 503, not an SSE error
+    ticket = await admission_controller.acquire(Priority.INTERACTIVE)
+    try:
+        # Verify chat exists and belongs to user
+        chat = await _get_user_chat(db, chat_id, current_user.id)
         
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Chat {chat_id}: Failed to get AI response - {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get AI response: {str(e)}"
+        user_message, is_first_message, conversation_history, keep_recent = await _prepare_exchange(
+            db, chat, message_data.content
         )
-    
\ No newline at end of file
+    except BaseException:
+        ticket.release()
+        raise
+    
+    # Also release after the response, in case the stream never starts
+    background_tasks.add_task(ticket.release)
+    
+    async def event_stream():
+        chunks = []
+        try:
+            async for chunk in stream_ai_response(conversation_history):
+                chunks.append(chunk)
+                yield _sse_event("chunk", json.dumps({"content": chunk}))
+            
+            ai_content = "".join(chunks).strip()
+            message_pair = await _complete_exchange(
+                db, chat, user_message, is_first_message, ai_content, background_tasks, keep_recent
+            )
+            yield _sse_event("done", message_pair.model_dump_json())
+            
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Chat {chat_id}: Failed to stream AI response - {str(e)}")
+            yield _sse_event("error", json.dumps({"detail": f"Failed to get AI response: {str(e)}"}))
+            
+        except BaseException:
+            # Client disconnected (cancellation / generator close) - discard the exchange
+            with anyio.CancelScope(shield=True):
+                await db.rollback()
+            logger.info(f"Chat {chat_id}: Client disconnected, message exchange rolled back")
+            raise
+            
+        finally:
+            ticket.release()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            # Headers set on the injected response (X-RateLimit-*) aren't merged into
+            # a returned Response, so copy them over
+            **{name: value for name, value in response.headers.items() if name.startswith("x-ratelimit-")},
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        }
+    )
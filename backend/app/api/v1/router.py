@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1 import user_routes, chat_routes, messages_routes,test_routes
+from app.api.v1 import user_routes, chat_routes, messages_routes,test_routes, admin_routes
 
 api_router = APIRouter()
 
@@ -26,4 +26,10 @@ api_router.include_router(
 api_router.include_router(
     test_routes.router,
     tags=["Testing"]
-)
\ No newline at end of file
+)
+
+api_router.include_router(
+    admin_routes.router,
+    prefix="/admin",
+    tags=["Admin"]
+)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter
-import google.generativeai as genai
 from app.core.config import settings
+from app.core.concurrency import llm_executor
+from app.services.model_registry import model_registry
 
 router = APIRouter()
 
@@ -14,13 +15,8 @@ async def test_gemini():
             "api_key_configured": False
         }
     
-    genai.configure(api_key=settings.GEMINI_API_KEY)
-    
     try:
-        models = []
-        for m in genai.list_models():
-            if 'generateContent' in m.supported_generation_methods:
-                models.append(m.name)
+        models = await llm_executor.run(model_registry.list_generation_models)
         
         return {
             "status": "success",
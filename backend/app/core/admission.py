@@ -0,0 +1,207 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+
+class Priority(IntEnum):
+    """Lower value is admitted first"""
+    INTERACTIVE = 0  # Authenticated chat messages
+    GUEST = 1
+    BACKGROUND = 2  # Summaries and other deferred work
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of queued (mapped to 503 in main)"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"LLM capacity exhausted ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+admission_wait = registry.histogram(
+    "quizbot_admission_wait_seconds", "Time spent queued before an LLM slot was granted", ("priority",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0)
+)
+admission_shed = registry.counter(
+    "quizbot_admission_shed", "LLM requests rejected by admission control", ("priority", "reason")
+)
+
+
+class Ticket:
+    """A granted LLM slot; release() is idempotent"""
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._released = False
+        self.admitted_at = time.monotonic()
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release(time.monotonic() - self.admitted_at)
+
+
+class AdmissionController:
+    """
+    Bounded priority queue in front of the LLM
+
+    At most `max_concurrency` requests hold a slot. Others wait in a priority
+    heap (FIFO within a priority) of at most `max_queue` entries. A request
+    is shed with AdmissionRejected, rather than left to time out at the load
+    balancer, in three cases:
+    - the queue is full;
+    - the expected wait, from a moving average of slot hold times, already
+      exceeds its deadline;
+    - the deadline passes while it waits.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float, enabled: bool = True):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.enabled = enabled
+        self._active = 0
+        self._queued = 0
+        self._waiters: List[list] = []  # heap of [priority, seq, future]
+        self._seq = itertools.count()
+        self._hold_time: Optional[float] = None  # EWMA of seconds a slot is held
+        self.admitted = 0
+        self.shed = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    @property
+    def in_flight(self) -> int:
+        return self._active
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._active,
+            "queue_depth": self._queued,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "avg_hold_seconds": round(self._hold_time, 3) if self._hold_time is not None else None,
+        }
+
+    def _has_live_waiters(self) -> bool:
+        """Waiters still owed a slot; handed-off ones may not have resumed yet but hold theirs"""
+        return any(not f.done() for _, _, f in self._waiters)
+
+    def _estimated_wait(self, priority: Priority) -> Optional[float]:
+        """
+        Seconds until a new request at `priority` would likely get a slot
+
+        Slots are held for staggered periods, so on average one frees up every
+        hold_time / max_concurrency seconds; the request needs one per waiter
+        ahead of it, plus its own.
+        """
+        if self._hold_time is None:
+            return None
+        ahead = sum(1 for p, _, f in self._waiters if p <= priority and not f.done())
+        return (ahead + 1) / self.max_concurrency * self._hold_time
+
+    def _reject(self, priority: Priority, reason: str, retry_after: Optional[float]) -> AdmissionRejected:
+        self.shed += 1
+        admission_shed.inc(priority=priority.name.lower(), reason=reason)
+        if retry_after is None:
+            retry_after = self._hold_time or 1.0
+        return AdmissionRejected(reason, retry_after)
+
+    async def acquire(self, priority: Priority, timeout: Optional[float] = None) -> Ticket:
+        """Wait for an LLM slot, or raise AdmissionRejected"""
+        if not self.enabled:
+            return Ticket(self)
+
+        timeout = self.queue_timeout if timeout is None else timeout
+        start = time.monotonic()
+
+        if self._active < self.max_concurrency and not self._has_live_waiters():
+            self._active += 1
+            return self._admitted(priority, start)
+
+        if self._queued >= self.max_queue:
+            raise self._reject(priority, "queue_full", self._estimated_wait(priority))
+
+        estimate = self._estimated_wait(priority)
+        if estimate is not None and estimate > timeout:
+            raise self._reject(priority, "deadline", estimate)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, [priority, next(self._seq), future])
+        self._queued += 1
+        try:
+            await asyncio.wait((future,), timeout=timeout)
+        except BaseException:
+            if future.done() and not future.cancelled():
+                # A slot was handed over just as we were cancelled; pass it on
+                self._release(None)
+            else:
+                future.cancel()
+            raise
+        finally:
+            self._queued -= 1
+
+        if not future.done():
+            future.cancel()
+            raise self._reject(priority, "timeout", self._estimated_wait(priority))
+
+        return self._admitted(priority, start)
+
+    def _admitted(self, priority: Priority, start: float) -> Ticket:
+        self.admitted += 1
+        admission_wait.observe(time.monotonic() - start, priority=priority.name.lower())
+        return Ticket(self)
+
+    def _release(self, hold_time: Optional[float]) -> None:
+        if not self.enabled:
+            return
+
+        if hold_time is not None:
+            self._hold_time = hold_time if self._hold_time is None else 0.8 * self._hold_time + 0.2 * hold_time
+
+        # Hand the slot straight to the best waiter; cancelled entries are skipped lazily
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority, timeout: Optional[float] = None):
+        ticket = await self.acquire(priority, timeout)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+
+def retry_after_header(error: AdmissionRejected) -> str:
+    return str(max(math.ceil(error.retry_after), 1))
+
+
+admission_controller = AdmissionController(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    enabled=settings.ADMISSION_ENABLED,
+)
+
+registry.gauge("quizbot_admission_queue_depth", "LLM requests waiting for a slot",
+               callback=lambda: admission_controller.queue_depth)
+registry.gauge("quizbot_admission_in_flight", "LLM requests holding a slot",
+               callback=lambda: admission_controller.in_flight)
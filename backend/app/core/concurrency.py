@@ -0,0 +1,116 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict
+
+from app.core.config import settings
+
+
+class BoundedExecutor:
+    """
+    Run blocking calls on a dedicated thread pool without blocking the event loop
+    
+    At most `max_concurrency` calls run at once; further callers wait (queued)
+    for a free slot instead of piling work onto the shared default executor.
+    """
+    
+    def __init__(self, max_concurrency: int, thread_name_prefix: str):
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix=thread_name_prefix
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+        self._queued = 0
+    
+    @property
+    def in_flight(self) -> int:
+        """Number of calls currently running"""
+        return self._in_flight
+    
+    @property
+    def queued(self) -> int:
+        """Number of calls waiting for a free slot"""
+        return self._queued
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "queued": self._queued,
+        }
+    
+    @asynccontextmanager
+    async def _slot(self):
+        self._queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._queued -= 1
+        
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+    
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking callable in the pool and return its result"""
+        async with self._slot():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor,
+                functools.partial(fn, *args, **kwargs)
+            )
+    
+    async def iterate(self, fn: Callable[..., Any], *args, **kwargs) -> AsyncIterator[Any]:
+        """
+        Call a blocking callable that returns an iterator and consume it in the pool
+        
+        Each `next()` runs on a pool thread, so slow producers such as streaming
+        API responses never block the event loop. One slot is held for the whole
+        iteration.
+        """
+        async with self._slot():
+            loop = asyncio.get_running_loop()
+            iterator = iter(await loop.run_in_executor(
+                self._executor,
+                functools.partial(fn, *args, **kwargs)
+            ))
+            done = object()
+            pending = None
+            
+            try:
+                while True:
+                    pending = self._executor.submit(next, iterator, done)
+                    item = await asyncio.wrap_future(pending)
+                    if item is done:
+                        break
+                    yield item
+            finally:
+                # Stop the producer when the consumer goes away (e.g. client disconnect).
+                # A generator can't be closed while another thread is inside next(),
+                # so close() is queued once the in-flight call returns.
+                close = getattr(iterator, "close", None)
+                if close is not None and pending is not None:
+                    pending.add_done_callback(lambda _: self._submit_quietly(close))
+    
+    def _submit_quietly(self, fn: Callable[[], Any]) -> None:
+        try:
+            self._executor.submit(fn)
+        except RuntimeError:
+            # Executor already shut down
+            pass
+    
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Dedicated pool for LLM API calls
+llm_executor = BoundedExecutor(settings.LLM_MAX_CONCURRENCY, thread_name_prefix="llm")
+
+# Separate pool for bcrypt so login bursts can't starve LLM calls (or vice versa)
+password_executor = BoundedExecutor(settings.PASSWORD_HASH_CONCURRENCY, thread_name_prefix="bcrypt")
@@ -4,26 +4,53 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# "production" switches logging/echo defaults to the low-overhead profile below
+_PRODUCTION = os.getenv("ENVIRONMENT", "development").lower() == "production"
+
 class Settings(BaseSettings):
     """Application settings"""
     
     # Project Info
     PROJECT_NAME: str = "Quizbot API"
     VERSION: str = "1.0.0"
+    ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
     
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./quizbot.db")
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))  # Persistent connections per worker
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))  # Extra connections under burst load
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Reopen connections older than this (-1 = never)
+    # Ping on every checkout. With a recycle below the server/proxy idle timeout
+    # this can be turned off to save a round trip per request.
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
     
     # Security
     SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-this-in-production")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))  # Work factor; older hashes are upgraded on login
+    PASSWORD_HASH_CONCURRENCY: int = int(os.getenv("PASSWORD_HASH_CONCURRENCY", "2"))  # Concurrent bcrypt calls per worker
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))  # 0 disables
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+    TOKEN_CACHE_MAX_ENTRIES: int = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
   
     # Google Gemini Configuration 
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "") 
     GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "models/gemini-2.5-flash")
     MAX_TOKENS: int = int(os.getenv("MAX_TOKENS", "500"))
     TEMPERATURE: float = float(os.getenv("TEMPERATURE", "0.7"))
+    LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "gemini")  # "gemini" or "fake" (offline, for benchmarks/CI)
+    LLM_WARM_UP: str = os.getenv("LLM_WARM_UP", "background")  # "background", "blocking" (before serving) or "off"
+    
+    # Fake LLM provider (LLM_PROVIDER=fake)
+    FAKE_LLM_LATENCY_MS: float = float(os.getenv("FAKE_LLM_LATENCY_MS", "300"))  # Mean time to first chunk
+    FAKE_LLM_LATENCY_SPREAD_MS: float = float(os.getenv("FAKE_LLM_LATENCY_SPREAD_MS", "50"))  # Std dev / half-width
+    FAKE_LLM_LATENCY_DISTRIBUTION: str = os.getenv("FAKE_LLM_LATENCY_DISTRIBUTION", "normal")  # fixed, uniform, normal, lognormal
+    FAKE_LLM_ERROR_RATE: float = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+    FAKE_LLM_CHUNK_COUNT: int = int(os.getenv("FAKE_LLM_CHUNK_COUNT", "8"))
+    FAKE_LLM_CHUNK_INTERVAL_MS: float = float(os.getenv("FAKE_LLM_CHUNK_INTERVAL_MS", "30"))
+    FAKE_LLM_SEED: int = int(os.getenv("FAKE_LLM_SEED", "0"))
     SYSTEM_PROMPT: str = """You are a helpful AI assistant called Quizbot. Follow these rules strictly:
 1. Be concise and direct in your responses
 2. NEVER use asterisks (*) for emphasis or formatting
@@ -31,11 +58,63 @@ class Settings(BaseSettings):
 4. Be friendly and accurate
 5. Keep responses brief unless asked for details"""
     MAX_CONTEXT_MESSAGES: int = int(os.getenv("MAX_CONTEXT_MESSAGES", "20"))
+    CONTEXT_TOKEN_BUDGET: int = int(os.getenv("CONTEXT_TOKEN_BUDGET", "8000"))  # Prompt + output tokens per request
+    
+    # Rolling conversation summaries for long chats
+    SUMMARY_ENABLED: bool = os.getenv("SUMMARY_ENABLED", "true").lower() == "true"
+    SUMMARY_BATCH_MESSAGES: int = int(os.getenv("SUMMARY_BATCH_MESSAGES", "10"))  # Messages folded in per update
+    SUMMARY_MAX_INPUT_MESSAGES: int = int(os.getenv("SUMMARY_MAX_INPUT_MESSAGES", "100"))
+    SUMMARY_MAX_TOKENS: int = int(os.getenv("SUMMARY_MAX_TOKENS", "300"))
+    SUMMARY_PROMPT: str = """You maintain a running summary of a conversation between a user and Quizbot.
+Update the current summary with the new messages. Keep the user's goals, key facts,
+answers already given and open questions. Write plain prose without asterisks,
+under 200 words. Reply with the updated summary only."""
+    
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # Concurrent Gemini calls per worker
+    # Admission control in front of the LLM: requests beyond LLM_MAX_CONCURRENCY queue by priority
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    ADMISSION_MAX_QUEUE: int = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))  # Waiting requests before shedding with 503
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "10"))  # Max wait for a slot
+    
+    # Pagination
+    DEFAULT_PAGE_SIZE: int = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+    MAX_PAGE_SIZE: int = int(os.getenv("MAX_PAGE_SIZE", "200"))
+    # Requests without limit/before/after get the full, unpaginated list (old clients)
+    LEGACY_UNPAGINATED_LISTS: bool = os.getenv("LEGACY_UNPAGINATED_LISTS", "true").lower() == "true"
+    
+    # Guest response cache
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_TTL_SECONDS: int = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+    RESPONSE_CACHE_DB_PATH: str = os.getenv("RESPONSE_CACHE_DB_PATH", "")  # Empty = memory only
+    
+    # Request profiling (off unless PROFILING_ENABLED)
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_ADMIN_TOKEN: str = os.getenv("PROFILING_ADMIN_TOKEN", "")  # Required for X-Profile and /admin routes
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))  # Fraction of requests profiled
+    PROFILING_DIR: str = os.getenv("PROFILING_DIR", "profiles")
+    PROFILING_MAX_FILES: int = int(os.getenv("PROFILING_MAX_FILES", "50"))
+    
+    # Rate Limiting (token buckets on the LLM-backed message routes)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))  # Per authenticated user
+    GUEST_RATE_LIMIT_PER_MINUTE: int = int(os.getenv("GUEST_RATE_LIMIT_PER_MINUTE", "10"))  # Per client IP
+    RATE_LIMIT_STORE: str = os.getenv("RATE_LIMIT_STORE", "memory")  # "memory" or "shared"
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))  # LRU bound on tracked users/IPs
+    # Proxies in front of the app (Cloud Run = 1, set in the Dockerfile); the client IP is taken that many hops from the right of X-Forwarded-For
+    RATE_LIMIT_TRUSTED_PROXIES: int = int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "0"))
     
-    # Rate Limiting
-    RATE_LIMIT_PER_MINUTE: int = 60
+    DEBUG: bool = os.getenv("DEBUG", "false" if _PRODUCTION else "true").lower() == "true"
     
-    DEBUG: bool = True
+    # Logging (records go through a queue; a background thread formats and writes them)
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "DEBUG" if DEBUG else "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json" if _PRODUCTION else "text")  # "json" or "text"
+    LOG_FILE: str = os.getenv("LOG_FILE", "" if _PRODUCTION else "logs/app.log")  # Empty = stdout only
+    # Per-logger sampling of INFO/DEBUG lines, e.g. "sqlalchemy.engine=0.01,app.access=0.1"
+    LOG_SAMPLING: str = os.getenv("LOG_SAMPLING", "")
+    DB_ECHO: bool = os.getenv("DB_ECHO", "false").lower() == "true"  # Log every SQL statement
+    # X-DB-Query-Count / X-DB-Time-Ms on every response; exposes internals, so opt-in
+    DB_QUERY_HEADERS: bool = os.getenv("DB_QUERY_HEADERS", "false").lower() == "true"
     
     class Config:
         case_sensitive = True
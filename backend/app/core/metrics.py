@@ -0,0 +1,288 @@
+import bisect
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram, cheap enough to update on every request"""
+    
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+    
+    @property
+    def count(self) -> int:
+        return self._count
+    
+    @property
+    def sum(self) -> float:
+        return self._sum
+    
+    def cumulative_counts(self) -> Dict[str, int]:
+        """Counts of observations <= each bucket bound, keyed like Prometheus `le` labels"""
+        with self._lock:
+            counts = list(self._counts)
+        
+        result = {}
+        running = 0
+        for bound, count in zip(self.buckets, counts):
+            running += count
+            result[repr(bound)] = running
+        result["+Inf"] = running + counts[-1]
+        return result
+    
+    def snapshot(self) -> Dict:
+        return {
+            "count": self._count,
+            "sum": round(self._sum, 6),
+            "buckets": self.cumulative_counts(),
+        }
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class _Metric:
+    """Named metric family with a fixed set of label names"""
+    type_name = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+    
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+    
+    def labels(self, **labels: Any) -> Any:
+        """Child series for these label values; keep a reference on hot paths"""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+    
+    def _series(self) -> List[Tuple[Dict[str, str], Any]]:
+        with self._lock:
+            items = list(self._children.items())
+        return [(dict(zip(self.labelnames, key)), child) for key, child in items]
+    
+    def samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        raise NotImplementedError
+    
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class _Value:
+    """Thread-safe number used as a counter or gauge child"""
+    
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+    
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value -= amount
+    
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """Monotonic counter"""
+    type_name = "counter"
+    
+    def _new_child(self) -> _Value:
+        return _Value()
+    
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        self.labels(**labels).inc(amount)
+    
+    def samples(self):
+        for labels, child in self._series():
+            yield f"{self.name}_total", labels, child.value
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or is read from a callback at scrape time"""
+    type_name = "gauge"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], float]] = None
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+    
+    def _new_child(self) -> _Value:
+        return _Value()
+    
+    def set(self, value: float, **labels: Any) -> None:
+        self.labels(**labels).set(value)
+    
+    def samples(self):
+        if self.callback is not None:
+            yield self.name, {}, self.callback()
+            return
+        for labels, child in self._series():
+            yield self.name, labels, child.value
+
+
+class HistogramMetric(_Metric):
+    """Labeled family of Histograms"""
+    type_name = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+    
+    def _new_child(self) -> Histogram:
+        return Histogram(self.buckets)
+    
+    def observe(self, value: float, **labels: Any) -> None:
+        self.labels(**labels).observe(value)
+    
+    def samples(self):
+        for labels, child in self._series():
+            for bound, count in child.cumulative_counts().items():
+                yield f"{self.name}_bucket", {**labels, "le": bound}, count
+            yield f"{self.name}_sum", labels, child.sum
+            yield f"{self.name}_count", labels, child.count
+
+
+class StatsCollector:
+    """Export the numeric fields of a stats() dict as gauges at scrape time"""
+    
+    def __init__(self, prefix: str, documentation: str, stats: Callable[[], Dict[str, Any]]):
+        self.prefix = prefix
+        self.documentation = documentation
+        self.stats = stats
+    
+    def render(self) -> List[str]:
+        lines = []
+        for key, value in self.stats().items():
+            if not isinstance(value, (int, float)):
+                continue
+            name = f"{self.prefix}_{key}"
+            lines.append(f"# HELP {name} {self.documentation} ({key})")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered in the Prometheus text exposition format"""
+    
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+    
+    def __init__(self):
+        self._collectors: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+    
+    def register(self, collector: Any) -> Any:
+        name = getattr(collector, "name", None) or getattr(collector, "prefix")
+        with self._lock:
+            self._collectors[name] = collector
+        return collector
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), callback=None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, callback))
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> HistogramMetric:
+        return self.register(HistogramMetric(name, documentation, labelnames, buckets))
+    
+    def render(self) -> str:
+        with self._lock:
+            collectors = list(self._collectors.values())
+        lines = []
+        for collector in collectors:
+            try:
+                lines.extend(collector.render())
+            except Exception:
+                # A broken collector must not take the whole scrape down
+                continue
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# Application metrics shared across modules
+http_requests = registry.counter(
+    "quizbot_http_requests", "HTTP requests by route template, method and status", ("route", "method", "status")
+)
+http_request_duration = registry.histogram(
+    "quizbot_http_request_duration_seconds", "Time to send the full HTTP response", ("route", "method", "status")
+)
+db_queries_per_request = registry.histogram(
+    "quizbot_db_queries_per_request", "SQL statements executed per HTTP request", ("route",),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+)
+db_time_per_request = registry.histogram(
+    "quizbot_db_time_per_request_seconds", "Time spent executing SQL per HTTP request", ("route",)
+)
+llm_request_duration = registry.histogram(
+    "quizbot_llm_request_duration_seconds", "LLM provider call latency", ("operation", "outcome"),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+)
+llm_errors = registry.counter("quizbot_llm_errors", "Failed LLM provider calls", ("operation",))
+llm_tokens = registry.counter("quizbot_llm_tokens", "Estimated LLM tokens (~4 chars/token)", ("operation", "kind"))
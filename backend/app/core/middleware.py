@@ -0,0 +1,108 @@
+import re
+import time
+import uuid
+
+from app.core.config import settings
+from app.core.logging import request_id_var
+from app.core.metrics import db_queries_per_request, db_time_per_request, http_request_duration, http_requests
+from app.db.instrumentation import start_query_tracking
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording per-route request counts, latency and query counts
+    
+    Routes are labeled by their template (e.g. /api/v1/chats/{chat_id}) so
+    label cardinality stays bounded. Latency and queries are taken when the
+    last body chunk is sent, before any background tasks run.
+    
+    With DB_QUERY_HEADERS the response also carries X-DB-Query-Count and
+    X-DB-Time-Ms, as of when the headers were sent (streamed bodies may query
+    afterwards).
+    """
+    
+    def __init__(self, app, query_headers: bool = settings.DB_QUERY_HEADERS):
+        self.app = app
+        self.query_headers = query_headers
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start = time.perf_counter()
+        query_stats = start_query_tracking()
+        status_code = 500
+        recorded = False
+        
+        def record():
+            nonlocal recorded
+            if recorded:
+                return
+            recorded = True
+            
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            labels = {"route": route_path, "method": scope["method"], "status": str(status_code)}
+            http_requests.inc(**labels)
+            http_request_duration.observe(time.perf_counter() - start, **labels)
+            db_queries_per_request.observe(query_stats.count, route=route_path)
+            db_time_per_request.observe(query_stats.duration, route=route_path)
+        
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.query_headers:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-db-query-count", str(query_stats.count).encode()),
+                        (b"x-db-time-ms", str(query_stats.duration_ms).encode()),
+                    ]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                record()
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            record()
+
+
+_REQUEST_ID = re.compile(r"^[\w.-]{1,128}$")
+
+
+class RequestContextMiddleware:
+    """
+    Assign each request an id for log correlation
+    
+    Reuses a well-formed incoming X-Request-ID (e.g. from the frontend or a
+    proxy), otherwise generates one, and echoes it on the response.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                if _REQUEST_ID.match(candidate):
+                    request_id = candidate
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode())]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,119 @@
+import cProfile
+import hmac
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.logging import logger
+
+PROFILE_HEADER = b"x-profile"
+_PROFILE_NAME = re.compile(r"^[\w.-]+\.prof$")
+
+
+class ProfileStore:
+    """Bounded on-disk ring buffer of pstats dumps; oldest files are dropped first"""
+    
+    def __init__(self, directory: str, max_files: int):
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self._lock = threading.Lock()
+    
+    def save(self, profiler: cProfile.Profile, method: str, route: str, duration_ms: float) -> str:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^\w]+", "_", route).strip("_") or "root"
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        name = f"{stamp}_{method}_{slug}_{int(duration_ms)}ms.prof"
+        
+        with self._lock:
+            profiler.dump_stats(str(self.directory / name))
+            self._prune()
+        return name
+    
+    def _prune(self) -> None:
+        files = sorted(self.directory.glob("*.prof"))
+        for old in files[:max(len(files) - self.max_files, 0)]:
+            old.unlink(missing_ok=True)
+    
+    def list(self) -> List[Dict]:
+        if not self.directory.exists():
+            return []
+        profiles = []
+        for path in sorted(self.directory.glob("*.prof"), reverse=True):
+            stat = path.stat()
+            profiles.append({
+                "name": path.name,
+                "size_bytes": stat.st_size,
+                "created_at": datetime.utcfromtimestamp(stat.st_mtime).isoformat(),
+            })
+        return profiles
+    
+    def path(self, name: str) -> Optional[Path]:
+        """Resolve a profile by name, refusing anything that isn't a plain file name"""
+        if not _PROFILE_NAME.match(name):
+            return None
+        path = self.directory / name
+        return path if path.is_file() else None
+
+
+profile_store = ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_FILES)
+
+# cProfile hooks the whole thread, so only one request is profiled at a time
+_profiling_lock = threading.Lock()
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    expected = settings.PROFILING_ADMIN_TOKEN
+    return bool(expected and token) and hmac.compare_digest(token, expected)
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware that cProfiles selected requests
+    
+    A request is profiled when it carries `X-Profile: <PROFILING_ADMIN_TOKEN>`
+    or is picked by PROFILING_SAMPLE_RATE. The middleware is only installed
+    when PROFILING_ENABLED is set. Because the event loop is shared, a
+    profile also contains whatever other tasks ran during the request, and
+    work done on executor threads (Gemini, bcrypt) shows up only as waiting.
+    """
+    
+    def __init__(self, app, store: ProfileStore = profile_store, sample_rate: float = 0.0):
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+    
+    def _should_profile(self, scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return is_admin_token(value.decode("latin-1"))
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        
+        if not _profiling_lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.disable()
+            _profiling_lock.release()
+            duration_ms = (time.perf_counter() - start) * 1000
+            route = getattr(scope.get("route"), "path", None) or scope["path"]
+            try:
+                name = self.store.save(profiler, scope["method"], route, duration_ms)
+                logger.info(f"Saved request profile {name}")
+            except OSError as e:
+                logger.warning(f"Failed to save request profile: {str(e)}")
@@ -0,0 +1,154 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple, Optional, Tuple
+
+from cachetools import TTLCache
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: float  # Seconds until `cost` tokens are available (0 when allowed)
+
+
+BucketState = Tuple[float, float]  # (tokens, last refill timestamp)
+
+
+def take_tokens(
+    state: Optional[BucketState],
+    now: float,
+    capacity: float,
+    refill_per_second: float,
+    cost: float = 1
+) -> Tuple[BucketState, RateLimitResult]:
+    """Token-bucket step: refill for the elapsed time, then try to spend `cost`"""
+    if state is None:
+        tokens = capacity
+    else:
+        tokens, updated = state
+        tokens = min(capacity, tokens + max(now - updated, 0.0) * refill_per_second)
+
+    if tokens >= cost:
+        tokens -= cost
+        return (tokens, now), RateLimitResult(True, int(tokens), 0.0)
+
+    retry_after = (cost - tokens) / refill_per_second if refill_per_second > 0 else float("inf")
+    return (tokens, now), RateLimitResult(False, 0, retry_after)
+
+
+class RateLimitStore:
+    """Where bucket state lives; implementations must make consume() atomic per key"""
+
+    async def consume(self, key: str, capacity: float, refill_per_second: float, cost: float = 1) -> RateLimitResult:
+        raise NotImplementedError
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """
+    Per-process buckets in an LRU dict, O(1) memory and time per active key
+
+    When `max_keys` is exceeded the least recently used bucket is dropped.
+    An evicted key simply starts again with a full bucket, which only matters
+    for keys idle long enough to fall out of a busy LRU.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, BucketState]" = OrderedDict()
+
+    async def consume(self, key, capacity, refill_per_second, cost=1) -> RateLimitResult:
+        # No awaits in here, so this is atomic on the event loop
+        state, result = take_tokens(self._buckets.get(key), time.monotonic(), capacity, refill_per_second, cost)
+        self._buckets[key] = state
+        self._buckets.move_to_end(key)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return result
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SharedStateBackend:
+    """
+    Minimal atomic key/value operations a shared store must provide
+
+    `update` applies `fn(old_value) -> (new_value, result)` atomically and
+    stores `new_value` with a TTL. A Redis backend would implement it with a
+    Lua script (or WATCH/MULTI) so several instances share one budget.
+    """
+
+    async def update(self, key: str, fn: Callable[[Any], Tuple[Any, Any]], ttl_seconds: float) -> Any:
+        raise NotImplementedError
+
+
+class LocalSharedBackend(SharedStateBackend):
+    """In-process stand-in for a shared backend, for development and single-instance runs"""
+
+    def __init__(self, max_keys: int, ttl_seconds: float):
+        self._data: TTLCache = TTLCache(maxsize=max_keys, ttl=ttl_seconds)
+        self._lock = asyncio.Lock()
+
+    async def update(self, key, fn, ttl_seconds) -> Any:
+        async with self._lock:
+            value, result = fn(self._data.get(key))
+            self._data[key] = value
+            return result
+
+
+class SharedRateLimitStore(RateLimitStore):
+    """Buckets kept in a SharedStateBackend; uses wall-clock time so instances agree"""
+
+    def __init__(self, backend: SharedStateBackend):
+        self.backend = backend
+
+    async def consume(self, key, capacity, refill_per_second, cost=1) -> RateLimitResult:
+        now = time.time()
+        # A bucket idle for this long is full again, so its state can expire
+        ttl = capacity / refill_per_second if refill_per_second > 0 else 3600
+        return await self.backend.update(
+            key,
+            lambda state: take_tokens(state, now, capacity, refill_per_second, cost),
+            ttl
+        )
+
+
+rate_limited_requests = registry.counter(
+    "quizbot_rate_limited_requests", "Requests rejected with 429 by the rate limiter", ("scope",)
+)
+
+
+class RateLimiter:
+    """Token buckets per key, with a budget of `per_minute` requests (burst = per_minute)"""
+
+    def __init__(self, store: RateLimitStore, enabled: bool = True):
+        self.store = store
+        self.enabled = enabled
+
+    async def hit(self, scope: str, key: str, per_minute: int, cost: float = 1) -> RateLimitResult:
+        if not self.enabled or per_minute <= 0:
+            return RateLimitResult(True, per_minute, 0.0)
+
+        result = await self.store.consume(f"{scope}:{key}", per_minute, per_minute / 60.0, cost)
+        if not result.allowed:
+            rate_limited_requests.inc(scope=scope)
+        return result
+
+
+def create_rate_limit_store(kind: Optional[str] = None) -> RateLimitStore:
+    """Build the store selected by RATE_LIMIT_STORE"""
+    kind = (kind or settings.RATE_LIMIT_STORE).lower()
+
+    if kind == "memory":
+        return MemoryRateLimitStore(settings.RATE_LIMIT_MAX_KEYS)
+    if kind == "shared":
+        # Swap LocalSharedBackend for a networked backend in multi-instance deployments
+        return SharedRateLimitStore(LocalSharedBackend(settings.RATE_LIMIT_MAX_KEYS, ttl_seconds=3600))
+    raise ValueError(f"Unknown RATE_LIMIT_STORE {kind!r}, expected 'memory' or 'shared'")
+
+
+rate_limiter = RateLimiter(create_rate_limit_store(), enabled=settings.RATE_LIMIT_ENABLED)
@@ -1,4 +1,5 @@
+# Import all models so Base.metadata is complete (used by migrations)
 from app.db.base import Base
 from app.models.user import User
 from app.models.chat import Chat
-from app.models.message import Message
\ No newline at end of file
+from app.models.message import Message
@@ -0,0 +1,109 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryStats:
+    """SQL statements executed, and time spent in them, within one request"""
+    
+    __slots__ = ("count", "duration")
+    
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0  # Seconds
+
+    @property
+    def duration_ms(self) -> float:
+        return round(self.duration * 1000, 3)
+
+
+# Set per request by the metrics middleware; the value is shared with child
+# tasks (e.g. streaming bodies) because they copy the context.
+_current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def start_query_tracking() -> QueryStats:
+    """Begin counting queries for the current request context"""
+    stats = QueryStats()
+    _current_query_stats.set(stats)
+    return stats
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_query_stats.get()
+
+
+def instrument_queries(engine: Engine) -> None:
+    """Attribute every statement run on `engine`, and its duration, to the active request"""
+    
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_query(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            context._query_started = time.perf_counter()
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end_query(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_query_stats.get()
+        started = getattr(context, "_query_started", None)
+        if stats is not None and started is not None:
+            stats.duration += time.perf_counter() - started
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised by assert_max_queries when a block runs more statements than allowed"""
+
+
+@contextmanager
+def count_queries(engine: Engine) -> Iterator[QueryStats]:
+    """
+    Count every statement run on `engine` inside the block, from any thread
+    
+    Unlike request tracking this doesn't rely on the context, so it also sees
+    queries made by a TestClient's server thread.
+    """
+    stats = QueryStats()
+    
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        stats.count += 1
+        context._budget_started = time.perf_counter()
+    
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_budget_started", None)
+        if started is not None:
+            stats.duration += time.perf_counter() - started
+    
+    event.listen(engine, "before_cursor_execute", _before)
+    event.listen(engine, "after_cursor_execute", _after)
+    try:
+        yield stats
+    finally:
+        event.remove(engine, "before_cursor_execute", _before)
+        event.remove(engine, "after_cursor_execute", _after)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, engine: Optional[Engine] = None) -> Iterator[QueryStats]:
+    """
+    Fail if the block executes more than `max_queries` statements
+    
+    Example:
+        with assert_max_queries(3):
+            client.get("/api/v1/chats", headers=auth)
+    """
+    if engine is None:
+        from app.db.session import async_engine
+        engine = async_engine.sync_engine
+    
+    with count_queries(engine) as stats:
+        yield stats
+    
+    if stats.count > max_queries:
+        raise QueryBudgetExceeded(
+            f"Expected at most {max_queries} queries, got {stats.count} ({stats.duration_ms} ms)"
+        )
@@ -0,0 +1,56 @@
+"""
+Schema migrations
+
+Run once per deployment (not per worker) before starting the app:
+
+    python -m app.db.migrations
+"""
+
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect
+
+from app.core.config import settings
+from app.core.logging import setup_logging
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+# Revisions matching schemas created by Base.metadata.create_all before migrations
+INITIAL_REVISION = "0001"
+CHAT_SUMMARY_REVISION = "0002"
+
+
+def get_alembic_config(url: str = None) -> Config:
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["url"] = url or settings.DATABASE_URL
+    return config
+
+
+def _adopt_legacy_database(config: Config, url: str) -> None:
+    """Stamp databases created by create_all so upgrades start from the right revision"""
+    engine = create_engine(url)
+    try:
+        tables = set(inspect(engine).get_table_names())
+        if "alembic_version" in tables or "chats" not in tables:
+            return
+        
+        columns = {column["name"] for column in inspect(engine).get_columns("chats")}
+    finally:
+        engine.dispose()
+    
+    revision = CHAT_SUMMARY_REVISION if "message_count" in columns else INITIAL_REVISION
+    command.stamp(config, revision)
+
+
+def run_migrations(url: str = None) -> None:
+    """Bring the database schema up to date"""
+    config = get_alembic_config(url)
+    _adopt_legacy_database(config, config.attributes["url"])
+    command.upgrade(config, "head")
+
+
+if __name__ == "__main__":
+    setup_logging()
+    run_migrations()
@@ -0,0 +1,89 @@
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+from app.core.metrics import registry
+
+
+class PoolMetrics:
+    """Connection pool counters and latency histograms"""
+    
+    def __init__(self):
+        self.checkout_latency = registry.histogram(
+            "quizbot_db_pool_checkout_seconds", "Time for pool.connect() incl. pre-ping"
+        ).labels()
+        self.wait_time = registry.histogram(
+            "quizbot_db_pool_wait_seconds", "Checkouts that found the pool exhausted"
+        ).labels()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout latency and pool waits"""
+    
+    def saturated(self) -> bool:
+        """No idle connection and no room to open another (-1 = unlimited overflow)"""
+        max_overflow = self._max_overflow
+        return max_overflow > -1 and self.checkedin() == 0 and self.overflow() >= max_overflow
+    
+    def connect(self):
+        must_wait = self.saturated()
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            pool_metrics.checkout_latency.observe(elapsed)
+            if must_wait:
+                pool_metrics.wait_time.observe(elapsed)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count connects, checkouts and invalidations on an engine's pool"""
+    
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        pool_metrics.connects += 1
+    
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_metrics.checkouts += 1
+    
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        pool_metrics.invalidations += 1
+
+
+def pool_stats(pool: Pool) -> Dict[str, Any]:
+    """Live pool state plus cumulative counters and histograms"""
+    stats: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+        })
+    
+    stats.update({
+        "checkouts": pool_metrics.checkouts,
+        "connects": pool_metrics.connects,
+        "invalidations": pool_metrics.invalidations,
+        "timeouts": pool_metrics.timeouts,
+        "checkout_latency_seconds": pool_metrics.checkout_latency.snapshot(),
+        "wait_seconds": pool_metrics.wait_time.snapshot(),
+    })
+    return stats
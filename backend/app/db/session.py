@@ -1,25 +1,80 @@
 
+from typing import Type
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import Pool, QueuePool
 
 from app.core.config import settings
+from app.core.metrics import StatsCollector, registry
+from app.db.instrumentation import instrument_queries
+from app.db.pool_metrics import InstrumentedAsyncQueuePool, instrument_engine, pool_stats
+
+
+def get_async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL to its async driver (aiosqlite / asyncpg)"""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    
+    for prefix in ("postgres://", "postgresql://", "postgresql+psycopg2://"):
+        if url.startswith(prefix):
+            url = "postgresql+asyncpg://" + url[len(prefix):]
+            # asyncpg takes `ssl` instead of libpq's `sslmode`
+            return url.replace("sslmode=", "ssl=")
+    
+    return url
+
+
+def get_pool_options(url: str, poolclass: Type[Pool] = InstrumentedAsyncQueuePool) -> dict:
+    """Pool sizing from settings; in-memory SQLite keeps SQLAlchemy's default pool"""
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    if ":memory:" in url or "mode=memory" in url:
+        return options
+    
+    options.update({
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    })
+    return options
+
+
+# Async engine used by the application. SQL logging is controlled by the
+# "sqlalchemy.engine" logger (DB_ECHO) rather than echo=, so it goes through
+# the logging queue instead of a synchronous stdout handler.
+async_engine = create_async_engine(
+    get_async_database_url(settings.DATABASE_URL),
+    **get_pool_options(settings.DATABASE_URL)
+)
+instrument_engine(async_engine.sync_engine)
+instrument_queries(async_engine.sync_engine)
+registry.register(StatsCollector("quizbot_db_pool", "Connection pool state", lambda: pool_stats(async_engine.pool)))
+
+# Create AsyncSessionLocal class. Objects stay loaded after commit, since
+# expired attributes can't be lazily refreshed under asyncio.
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
 
-# Create database engine
+# Sync engine for migrations and maintenance scripts (utils.py)
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    pool_pre_ping=True,  # Verify connections before using them
-    echo=settings.DEBUG  # Log SQL queries in debug mode
+    **get_pool_options(settings.DATABASE_URL, poolclass=QueuePool)
 )
 
-# Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Dependency to get database session
-def get_db():
+async def get_db():
 
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
@@ -1,22 +1,66 @@
-from fastapi import FastAPI, Response
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
 
 from app.core.config import settings
 from app.api.v1.router import api_router
-from app.db.base import Base
-from app.db.session import engine
+from app.core.admission import AdmissionRejected, admission_controller, retry_after_header
+from app.core.concurrency import llm_executor, password_executor
+from app.core.logging import logger, setup_logging
+from app.core.metrics import StatsCollector, registry
+from app.core.middleware import MetricsMiddleware, RequestContextMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.db.pool_metrics import pool_stats
+from app.db.session import async_engine, engine
+from app.services.llm_provider import llm_provider
+from app.services.principal_cache import principal_cache
+from app.services.response_cache import response_cache
+from app.services.single_flight import llm_single_flight
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
+UPLOAD_DIR = Path("uploads")
+
+def warm_up_llm():
+    """Import the LLM SDK and build its clients ahead of the first request"""
+    try:
+        llm_provider.warm_up()
+    except Exception as e:
+        logger.warning(f"LLM provider warm-up failed: {str(e)}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Process setup lives here rather than at import, so importing the app stays cheap
+    setup_logging()
+    UPLOAD_DIR.mkdir(exist_ok=True)
+    logger.info(f"LLM provider: {llm_provider.name}")
+    
+    # In the background by default, so the port opens without waiting on the SDK
+    warm_up = settings.LLM_WARM_UP.lower()
+    if warm_up == "blocking":
+        await asyncio.to_thread(warm_up_llm)
+    elif warm_up == "background":
+        asyncio.get_running_loop().run_in_executor(None, warm_up_llm)
+    
+    yield
+    
+    llm_executor.shutdown()
+    password_executor.shutdown()
+    # aiosqlite keeps a non-daemon thread per pooled connection, which would
+    # otherwise block interpreter exit
+    await async_engine.dispose()
+    engine.dispose()
 
 app = FastAPI(
     title="AI Chatbot API",
     description="Backend API for AI-powered chatbot application",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# CORS Configuration - CRITICAL: Must be FIRST
+# CORS Configuration. Middleware added later wraps it, so metrics, profiling
+# and request ids also cover preflight requests
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -29,6 +73,32 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Request metrics for /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Opt-in request profiling; not installed at all unless enabled
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware, sample_rate=settings.PROFILING_SAMPLE_RATE)
+
+# Request ids for log correlation (outermost, so every log line of a request carries it)
+app.add_middleware(RequestContextMiddleware)
+
+# Gauges read from component stats at scrape time
+registry.register(StatsCollector("quizbot_llm_executor", "Gemini thread pool", llm_executor.stats))
+registry.register(StatsCollector("quizbot_password_executor", "bcrypt thread pool", password_executor.stats))
+registry.register(StatsCollector("quizbot_response_cache", "Guest response cache", response_cache.stats))
+registry.register(StatsCollector("quizbot_single_flight", "Coalesced Gemini calls", llm_single_flight.stats))
+registry.register(StatsCollector("quizbot_principal_cache", "Authenticated principal cache", principal_cache.stats))
+
+# Shed LLM requests we can't start in time
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "The assistant is busy, please retry shortly"},
+        headers={"Retry-After": retry_after_header(exc)}
+    )
+
 # Add OPTIONS handler for all routes
 @app.options("/{full_path:path}")
 async def options_handler(full_path: str):
@@ -42,10 +112,6 @@ async def options_handler(full_path: str):
         }
     )
 
-# Create uploads directory
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
-
 # Include API router with /api/v1 prefix
 app.include_router(api_router, prefix="/api/v1")
 
@@ -61,4 +127,18 @@ async def root():
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {
+        "status": "healthy",
+        "llm": llm_executor.stats(),
+        "admission": admission_controller.stats(),
+        "password_hashing": password_executor.stats(),
+        "response_cache": response_cache.stats(),
+        "single_flight": llm_single_flight.stats(),
+        "db_pool": pool_stats(async_engine.pool),
+        "principal_cache": principal_cache.stats()
+    }
+
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(content=registry.render(), media_type=registry.CONTENT_TYPE)
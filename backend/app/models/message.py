@@ -1,13 +1,20 @@
 
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, event, func, select
+from sqlalchemy.orm import relationship, object_session
 from datetime import datetime
 from app.db.base import Base
+from app.models.chat import Chat
+from app.utils.context_manager import ConversationContextManager
+
+PREVIEW_LENGTH = 200
 
 class Message(Base):
     """Message model"""
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_chat_id_created_at", "chat_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     chat_id = Column(Integer, ForeignKey("chats.id"), nullable=False)
@@ -15,10 +22,60 @@ class Message(Base):
     content = Column(Text, nullable=False)
     file_path = Column(String, nullable=True)  # ADD THIS
     file_name = Column(String, nullable=True)  # ADD THIS
+    token_count = Column(Integer, nullable=True)  # Estimated tokens, set on insert
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     chat = relationship("Chat", back_populates="messages")
     
     def __repr__(self):
-        return f"<Message {self.role}: {self.content[:50]}>"
\ No newline at end of file
+        return f"<Message {self.role}: {self.content[:50]}>"
+
+
+@event.listens_for(Message, "before_insert")
+def _set_token_count(mapper, connection, target):
+    if target.token_count is None:
+        target.token_count = ConversationContextManager.estimate_text_tokens(target.content)
+
+
+# Keep Chat.message_count / Chat.last_message_preview in sync with messages
+@event.listens_for(Message, "after_insert")
+def _increment_chat_summary(mapper, connection, target):
+    chats = Chat.__table__
+    connection.execute(
+        chats.update()
+        .where(chats.c.id == target.chat_id)
+        .values(
+            message_count=chats.c.message_count + 1,
+            last_message_preview=target.content[:PREVIEW_LENGTH],
+            updated_at=chats.c.updated_at  # Not a user-visible update
+        )
+    )
+
+
+@event.listens_for(Message, "after_delete")
+def _decrement_chat_summary(mapper, connection, target):
+    session = object_session(target)
+    chat = session.get(Chat, target.chat_id) if session is not None else None
+    if chat is not None and chat in session.deleted:
+        # The whole chat is going away
+        return
+    
+    chats = Chat.__table__
+    messages = Message.__table__
+    latest_content = (
+        select(func.substr(messages.c.content, 1, PREVIEW_LENGTH))
+        .where(messages.c.chat_id == target.chat_id)
+        .order_by(messages.c.created_at.desc(), messages.c.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    connection.execute(
+        chats.update()
+        .where(chats.c.id == target.chat_id)
+        .values(
+            message_count=chats.c.message_count - 1,
+            last_message_preview=latest_content,
+            updated_at=chats.c.updated_at
+        )
+    )
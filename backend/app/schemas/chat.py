@@ -38,6 +38,7 @@ class ChatResponse(ChatBase):
     created_at: datetime
     updated_at: datetime
     message_count: int = 0
+    last_message_preview: Optional[str] = None
     
     class Config:
         from_attributes = True
@@ -45,10 +46,14 @@ class ChatResponse(ChatBase):
 class ChatWithMessages(ChatResponse):
     """Schema for chat with messages"""
     messages: List[MessageInChat] = []
+    next_cursor: Optional[str] = None  # Older messages
+    prev_cursor: Optional[str] = None  # Newer messages
     
     class Config:
         from_attributes = True
 
 class ChatListResponse(BaseModel):
     """Schema for chat list response"""
-    chats: List[ChatResponse]
\ No newline at end of file
+    chats: List[ChatResponse]
+    next_cursor: Optional[str] = None  # Older chats
+    prev_cursor: Optional[str] = None  # Newer chats
\ No newline at end of file
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+
+class MessageSearchHit(BaseModel):
+    """A message matching a search query"""
+    message_id: int
+    chat_id: int
+    chat_title: str
+    role: str
+    snippet: str  # HTML-escaped text, matched terms wrapped in <mark></mark>
+    score: float  # Higher is more relevant
+    created_at: datetime
+
+
+class MessageSearchResponse(BaseModel):
+    """Schema for ranked message search results"""
+    results: List[MessageSearchHit]
+    next_offset: Optional[int] = None
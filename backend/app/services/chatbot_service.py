@@ -1,12 +1,16 @@
 
 import re
-import google.generativeai as genai
-from typing import List, Dict
+import time
+from typing import Any, List, Dict, AsyncIterator, Optional
+from app.core.admission import Priority, admission_controller
 from app.core.config import settings
 from app.core.logging import logger
-
-# Configure Gemini API
-genai.configure(api_key=settings.GEMINI_API_KEY)
+from app.core.metrics import llm_errors, llm_request_duration, llm_tokens
+from app.services.llm_provider import llm_provider
+from app.services.model_registry import default_generation_config
+from app.services.response_cache import response_cache
+from app.services.single_flight import llm_single_flight
+from app.utils.context_manager import ConversationContextManager
 
 
 def remove_asterisks(text: str) -> str:
@@ -15,51 +19,101 @@ def remove_asterisks(text: str) -> str:
     return text
 
 
-async def get_ai_response(messages: List[Dict[str, str]]) -> str:
+def _record_llm_call(operation: str, start: float, messages: List[Dict[str, str]], response_chars: Optional[int]) -> None:
+    """Update LLM latency, error and estimated token metrics"""
+    outcome = "error" if response_chars is None else "success"
+    llm_request_duration.observe(time.perf_counter() - start, operation=operation, outcome=outcome)
+    llm_tokens.inc(ConversationContextManager.estimate_tokens(messages), operation=operation, kind="prompt")
+    if response_chars is None:
+        llm_errors.inc(operation=operation)
+    else:
+        llm_tokens.inc(response_chars // 4, operation=operation, kind="response")
+
+
+async def get_ai_response(
+    messages: List[Dict[str, str]],
+    generation_config: Optional[Dict[str, Any]] = None
+) -> str:
     """
-    Get AI response from Google Gemini
+    Get AI response from the configured LLM provider (Google Gemini by default)
     
     Args:
         messages: List of message dicts with 'role' and 'content'
+        generation_config: Overrides the default chat generation config
     
     Returns:
         AI response as string (without asterisks)
     """
+    start = time.perf_counter()
     try:
-        # Initialize the model
-        model = genai.GenerativeModel(
-            model_name=settings.GEMINI_MODEL,
-            generation_config={
-                "temperature": settings.TEMPERATURE,
-                "max_output_tokens": settings.MAX_TOKENS,
-            }
-        )
-        
-        # Build conversation prompt
-        conversation = ""
+        ai_response = await llm_provider.generate(messages, generation_config)
         
-        for msg in messages:
-            role = msg.get("role")
-            content = msg.get("content", "")
-            
-            if role == "system":
-                conversation += f"System Instructions: {content}\n\n"
-            elif role == "user":
-                conversation += f"User: {content}\n\n"
-            elif role == "assistant":
-                conversation += f"Assistant: {content}\n\n"
-        
-        # Get response
-        response = model.generate_content(conversation)
-        
-        # Extract text and remove asterisks
-        ai_response = response.text
+        # Remove asterisks
         ai_response = remove_asterisks(ai_response)
         
-        logger.info(f"Gemini API call successful. Response length: {len(ai_response)} chars")
+        logger.info(f"LLM call successful ({llm_provider.name}). Response length: {len(ai_response)} chars")
+        _record_llm_call("generate", start, messages, len(ai_response))
         
         return ai_response.strip()
         
     except Exception as e:
-        logger.error(f"Gemini API error: {str(e)}")
-        raise Exception(f"Failed to get AI response: {str(e)}")
\ No newline at end of file
+        _record_llm_call("generate", start, messages, None)
+        logger.error(f"LLM provider error ({llm_provider.name}): {str(e)}")
+        raise Exception(f"Failed to get AI response: {str(e)}")
+
+
+async def get_cached_ai_response(
+    messages: List[Dict[str, str]],
+    priority: Priority = Priority.GUEST
+) -> str:
+    """
+    Get AI response, serving identical prompts from the response cache
+    
+    Concurrent identical prompts share a single upstream call. Only suitable
+    for prompts without per-user state (e.g. guest messages).
+    """
+    key = response_cache.make_key(messages, llm_provider.model_name, default_generation_config())
+    
+    if settings.RESPONSE_CACHE_ENABLED:
+        cached = await response_cache.get(key)
+        if cached is not None:
+            logger.info("Response cache hit")
+            return cached
+    
+    async def fetch() -> str:
+        # Only cache misses need an LLM slot
+        async with admission_controller.slot(priority):
+            ai_response = await get_ai_response(messages)
+        if settings.RESPONSE_CACHE_ENABLED:
+            await response_cache.set(key, ai_response)
+        return ai_response
+    
+    return await llm_single_flight.do(key, fetch)
+
+
+async def stream_ai_response(messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+    """
+    Stream AI response chunks from the configured LLM provider as they are generated
+    
+    Args:
+        messages: List of message dicts with 'role' and 'content'
+    
+    Yields:
+        Response text chunks (without asterisks)
+    """
+    start = time.perf_counter()
+    try:
+        total_length = 0
+        async for chunk in llm_provider.stream(messages):
+            text = remove_asterisks(chunk)
+            if text:
+                total_length += len(text)
+                yield text
+        
+        logger.info(f"LLM streaming call successful ({llm_provider.name}). Response length: {total_length} chars")
+        _record_llm_call("stream", start, messages, total_length)
+        
+    except Exception as e:
+        _record_llm_call("stream", start, messages, None)
+        logger.error(f"LLM provider error ({llm_provider.name}): {str(e)}")
+        raise Exception(f"Failed to get AI response: {str(e)}")
@@ -0,0 +1,36 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.message import Message
+
+
+async def fetch_context_window(
+    db: AsyncSession,
+    chat_id: int,
+    limit: int,
+    after_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Fetch the newest `limit` messages of a chat, in conversation order
+    
+    Only the role/content/token_count columns are selected, so no ORM
+    objects are built. With `after_id`, messages up to and including that id
+    (e.g. those covered by the chat summary) are skipped.
+    """
+    query = select(Message.role, Message.content, Message.token_count).where(Message.chat_id == chat_id)
+    if after_id is not None:
+        query = query.where(Message.id > after_id)
+    
+    result = await db.execute(
+        query
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(limit)
+    )
+    rows = result.all()
+    
+    return [
+        {"role": role, "content": content, "token_count": token_count}
+        for role, content, token_count in reversed(rows)
+    ]
@@ -0,0 +1,205 @@
+import hashlib
+import math
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from app.core.concurrency import llm_executor
+from app.core.config import settings
+from app.services.model_registry import model_registry
+
+
+def build_prompt(messages: List[Dict[str, str]]) -> str:
+    """Flatten role/content messages into a single text prompt"""
+    conversation = ""
+    
+    for msg in messages:
+        role = msg.get("role")
+        content = msg.get("content", "")
+        
+        if role == "system":
+            conversation += f"System Instructions: {content}\n\n"
+        elif role == "user":
+            conversation += f"User: {content}\n\n"
+        elif role == "assistant":
+            conversation += f"Assistant: {content}\n\n"
+    
+    return conversation
+
+
+class LLMProvider:
+    """
+    Text generation backend used by the chat services
+    
+    Providers take role/content messages and return raw model text; cleanup
+    such as asterisk removal stays in chatbot_service. Blocking work must run
+    on `llm_executor` so LLM_MAX_CONCURRENCY applies to every provider.
+    """
+    name = "base"
+    
+    @property
+    def model_name(self) -> str:
+        """Identifies the model in cache keys and logs"""
+        return self.name
+    
+    async def generate(
+        self,
+        messages: List[Dict[str, str]],
+        generation_config: Optional[Dict[str, Any]] = None,
+        attachments: Optional[List[Any]] = None,
+        model_name: Optional[str] = None
+    ) -> str:
+        raise NotImplementedError
+    
+    def stream(
+        self,
+        messages: List[Dict[str, str]],
+        generation_config: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        raise NotImplementedError
+    
+    def warm_up(self) -> None:
+        """Prepare clients ahead of the first request"""
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini through the google-generativeai SDK"""
+    name = "gemini"
+    
+    @property
+    def model_name(self) -> str:
+        return settings.GEMINI_MODEL
+    
+    async def generate(self, messages, generation_config=None, attachments=None, model_name=None) -> str:
+        model = model_registry.get(model_name, generation_config)
+        contents: Any = build_prompt(messages)
+        if attachments:
+            contents = [contents, *attachments]
+        
+        # Run on the LLM pool so the event loop stays free
+        response = await llm_executor.run(model.generate_content, contents)
+        return response.text
+    
+    async def stream(self, messages, generation_config=None) -> AsyncIterator[str]:
+        model = model_registry.get(generation_config=generation_config)
+        conversation = build_prompt(messages)
+        
+        async for chunk in llm_executor.iterate(model.generate_content, conversation, stream=True):
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. the final finish_reason chunk)
+                continue
+            if text:
+                yield text
+    
+    def warm_up(self) -> None:
+        model_registry.warm_up()
+
+
+class FakeLLMError(Exception):
+    """Injected failure from FakeProvider"""
+
+
+class FakeProvider(LLMProvider):
+    """
+    Deterministic local stand-in for benchmarks, CI and capacity planning
+    
+    Latency to the first chunk is drawn from a seeded distribution (fixed,
+    uniform, normal or lognormal around `latency_ms`), followed by
+    `chunk_count` chunks every `chunk_interval_ms`. Calls block an
+    `llm_executor` thread like the real SDK, so concurrency limits behave as
+    in production. Response text depends only on the prompt.
+    """
+    name = "fake"
+    DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+    
+    def __init__(
+        self,
+        latency_ms: float = 300.0,
+        spread_ms: float = 50.0,
+        distribution: str = "normal",
+        error_rate: float = 0.0,
+        chunk_count: int = 8,
+        chunk_interval_ms: float = 30.0,
+        seed: int = 0
+    ):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution {distribution!r}, expected one of {self.DISTRIBUTIONS}")
+        
+        self.latency_ms = latency_ms
+        self.spread_ms = spread_ms
+        self.distribution = distribution
+        self.error_rate = error_rate
+        self.chunk_count = max(chunk_count, 1)
+        self.chunk_interval_ms = chunk_interval_ms
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def _sample(self) -> tuple:
+        """(first-chunk latency in seconds, whether this call fails)"""
+        with self._lock:
+            if self.distribution == "fixed":
+                latency = self.latency_ms
+            elif self.distribution == "uniform":
+                latency = self._random.uniform(self.latency_ms - self.spread_ms, self.latency_ms + self.spread_ms)
+            elif self.distribution == "normal":
+                latency = self._random.gauss(self.latency_ms, self.spread_ms)
+            else:
+                # Lognormal with the given mean and standard deviation: a long right tail
+                mean = max(self.latency_ms, 1e-3)
+                sigma2 = math.log(1 + (self.spread_ms / mean) ** 2)
+                latency = self._random.lognormvariate(math.log(mean) - sigma2 / 2, math.sqrt(sigma2))
+            fails = self._random.random() < self.error_rate
+        return max(latency, 0.0) / 1000, fails
+    
+    def _chunks(self, messages: List[Dict[str, str]]) -> List[str]:
+        prompt = build_prompt(messages)
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+        words = f"Fake answer {digest} to a prompt of {len(prompt)} characters.".split()
+        per_chunk = math.ceil(len(words) / self.chunk_count)
+        return [" ".join(words[i:i + per_chunk]) + " " for i in range(0, len(words), per_chunk)]
+    
+    def _blocking_stream(self, chunks: List[str], latency: float, fails: bool) -> Iterator[str]:
+        time.sleep(latency)
+        if fails:
+            raise FakeLLMError("Injected fake provider error")
+        for index, chunk in enumerate(chunks):
+            if index:
+                time.sleep(self.chunk_interval_ms / 1000)
+            yield chunk
+    
+    def _blocking_generate(self, chunks: List[str], latency: float, fails: bool) -> str:
+        return "".join(self._blocking_stream(chunks, latency, fails))
+    
+    async def generate(self, messages, generation_config=None, attachments=None, model_name=None) -> str:
+        latency, fails = self._sample()
+        return await llm_executor.run(self._blocking_generate, self._chunks(messages), latency, fails)
+    
+    async def stream(self, messages, generation_config=None) -> AsyncIterator[str]:
+        latency, fails = self._sample()
+        async for chunk in llm_executor.iterate(self._blocking_stream, self._chunks(messages), latency, fails):
+            yield chunk
+
+
+def create_provider(name: Optional[str] = None) -> LLMProvider:
+    """Build the provider selected by LLM_PROVIDER"""
+    name = (name or settings.LLM_PROVIDER).lower()
+    
+    if name == "gemini":
+        return GeminiProvider()
+    if name == "fake":
+        return FakeProvider(
+            latency_ms=settings.FAKE_LLM_LATENCY_MS,
+            spread_ms=settings.FAKE_LLM_LATENCY_SPREAD_MS,
+            distribution=settings.FAKE_LLM_LATENCY_DISTRIBUTION,
+            error_rate=settings.FAKE_LLM_ERROR_RATE,
+            chunk_count=settings.FAKE_LLM_CHUNK_COUNT,
+            chunk_interval_ms=settings.FAKE_LLM_CHUNK_INTERVAL_MS,
+            seed=settings.FAKE_LLM_SEED,
+        )
+    raise ValueError(f"Unknown LLM_PROVIDER {name!r}, expected 'gemini' or 'fake'")
+
+
+llm_provider = create_provider()
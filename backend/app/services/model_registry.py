@@ -0,0 +1,104 @@
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import logger
+
+if TYPE_CHECKING:
+    import google.generativeai as genai
+
+
+def default_generation_config() -> Dict[str, Any]:
+    """Generation config used for chat responses"""
+    return {
+        "temperature": settings.TEMPERATURE,
+        "max_output_tokens": settings.MAX_TOKENS,
+    }
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of Gemini models keyed by (model name, generation config)
+    
+    `genai.configure` drops every cached transport client, so it is called
+    exactly once here; models built by the registry then share the SDK's
+    default gRPC channel across requests. The SDK (and grpc under it) is
+    imported on first use rather than with the app.
+    """
+    
+    def __init__(self):
+        self._models: Dict[Tuple[str, Tuple], "genai.GenerativeModel"] = {}
+        self._available_models: Optional[List[str]] = None
+        self._configured = False
+        self._lock = threading.Lock()
+    
+    def configure(self) -> None:
+        """Configure the Gemini SDK once per process"""
+        if self._configured:
+            return
+        
+        with self._lock:
+            if not self._configured:
+                import google.generativeai as genai
+                
+                genai.configure(api_key=settings.GEMINI_API_KEY)
+                self._configured = True
+    
+    @staticmethod
+    def _key(model_name: str, generation_config: Dict[str, Any]) -> Tuple[str, Tuple]:
+        return model_name, tuple(sorted(generation_config.items()))
+    
+    def get(
+        self,
+        model_name: Optional[str] = None,
+        generation_config: Optional[Dict[str, Any]] = None
+    ) -> "genai.GenerativeModel":
+        """Return the cached model for this name and config, building it on first use"""
+        model_name = model_name or settings.GEMINI_MODEL
+        if generation_config is None:
+            generation_config = default_generation_config()
+        
+        key = self._key(model_name, generation_config)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+        
+        self.configure()
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                import google.generativeai as genai
+                
+                model = genai.GenerativeModel(
+                    model_name=model_name,
+                    generation_config=generation_config
+                )
+                self._models[key] = model
+                logger.info(f"Model registry: built {model_name} {dict(key[1])}")
+        
+        return model
+    
+    def warm_up(self) -> None:
+        """Build the default model and its transport client ahead of the first request"""
+        from google.generativeai import client as genai_client
+        
+        self.get()
+        genai_client.get_default_generative_client()
+        logger.info(f"Model registry: warmed {settings.GEMINI_MODEL}")
+    
+    def list_generation_models(self) -> List[str]:
+        """Names of models supporting generateContent (fetched once, then cached)"""
+        if self._available_models is None:
+            import google.generativeai as genai
+            
+            self.configure()
+            self._available_models = [
+                m.name for m in genai.list_models()
+                if 'generateContent' in m.supported_generation_methods
+            ]
+        
+        return self._available_models
+
+
+# Create singleton instance
+model_registry = ModelRegistry()
@@ -0,0 +1,134 @@
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+
+from cachetools import TTLCache
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """Immutable snapshot of an authenticated user, safe to share across sessions"""
+    id: int
+    name: str
+    email: str
+    avatar_url: Optional[str]
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: User) -> "CurrentUser":
+        return cls(
+            id=user.id,
+            name=user.name,
+            email=user.email,
+            avatar_url=user.avatar_url,
+            created_at=user.created_at,
+        )
+
+
+class PrincipalCache:
+    """Bounded TTL caches for resolved principals and verified tokens"""
+
+    def __init__(self, max_entries: int, ttl_seconds: int, max_tokens: int):
+        self.enabled = ttl_seconds > 0 and max_entries > 0
+        self._users: TTLCache = TTLCache(maxsize=max(max_entries, 1), ttl=max(ttl_seconds, 1))
+        # token -> (user_id, exp); entries are also checked against the token's own expiry
+        self._tokens: TTLCache = TTLCache(maxsize=max(max_tokens, 1), ttl=max(ttl_seconds, 1))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.token_hits = 0
+
+    def get(self, user_id: int) -> Optional[CurrentUser]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            principal = self._users.get(user_id)
+            if principal is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return principal
+
+    def set(self, principal: CurrentUser) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._users[principal.id] = principal
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def get_token_subject(self, token: str) -> Optional[int]:
+        """User id for a previously verified, still unexpired token"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry: Optional[Tuple[int, Optional[float]]] = self._tokens.get(token)
+            if entry is None:
+                return None
+            user_id, exp = entry
+            if exp is not None and exp <= time.time():
+                self._tokens.pop(token, None)
+                return None
+            self.token_hits += 1
+        return user_id
+
+    def remember_token(self, token: str, user_id: int, exp: Optional[float]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._tokens[token] = (user_id, exp)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._users.clear()
+            self._tokens.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "users": len(self._users),
+            "tokens": len(self._tokens),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "token_hits": self.token_hits,
+        }
+
+
+principal_cache = PrincipalCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_tokens=settings.TOKEN_CACHE_MAX_ENTRIES,
+)
+
+
+# Invalidate on flush, and again after commit so a concurrent request can't
+# re-cache the pre-commit row in between.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_principal(mapper, connection, target):
+    principal_cache.invalidate(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_user_ids", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_principals(session):
+    for user_id in session.info.pop("changed_user_ids", ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_principals(session):
+    session.info.pop("changed_user_ids", None)
@@ -0,0 +1,166 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from cachetools import TLRUCache
+
+from app.core.config import settings
+from app.core.logging import logger
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different prompts share an entry"""
+    return " ".join(text.split())
+
+
+def _expiry(key: str, entry: Tuple[str, float], now: float) -> float:
+    """TLRUCache time-to-use: each entry keeps the expiry it was written with"""
+    return entry[1]
+
+
+class ResponseCache:
+    """
+    Exact-match cache of LLM responses
+    
+    Entries live in a size-bounded LRU with a TTL. When `db_path` is set,
+    entries are also written to SQLite so the cache survives restarts;
+    memory misses fall through to disk. The database is opened on first use
+    and all disk access runs in a worker thread, off the event loop.
+    """
+    
+    PRUNE_EVERY = 100  # Disk writes between expired-row sweeps
+    
+    def __init__(self, max_entries: int, ttl_seconds: int, db_path: str = ""):
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        # (value, expires_at) with wall-clock expiry, so disk hits keep their original deadline
+        self._memory = TLRUCache(maxsize=max_entries, ttu=_expiry, timer=time.time)
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the cache database; call with _db_lock held"""
+        if self._db is None:
+            db = sqlite3.connect(self.db_path, check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS ix_response_cache_expires_at "
+                "ON response_cache (expires_at)"
+            )
+            db.commit()
+            self._db = db
+        return self._db
+    
+    @staticmethod
+    def make_key(
+        messages: List[Dict[str, str]],
+        model_name: str,
+        generation_config: Dict[str, Any]
+    ) -> str:
+        """Hash the normalized prompt together with the model and generation config"""
+        payload = json.dumps(
+            {
+                "model": model_name,
+                "config": sorted(generation_config.items()),
+                "messages": [
+                    [m.get("role"), normalize_text(m.get("content", ""))]
+                    for m in messages
+                ],
+            },
+            separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _disk_get(self, key: str) -> Optional[Tuple[str, float]]:
+        try:
+            with self._db_lock:
+                return self._connect().execute(
+                    "SELECT value, expires_at FROM response_cache WHERE key = ? AND expires_at > ?",
+                    (key, time.time())
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache disk read failed: {str(e)}")
+            return None
+    
+    def _disk_set(self, key: str, value: str, expires_at: float) -> None:
+        try:
+            with self._db_lock:
+                db = self._connect()
+                db.execute(
+                    "INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, expires_at)
+                )
+                self._writes += 1
+                if self._writes % self.PRUNE_EVERY == 0:
+                    db.execute("DELETE FROM response_cache WHERE expires_at <= ?", (time.time(),))
+                db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache disk write failed: {str(e)}")
+    
+    async def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+        
+        if entry is None and self.db_path:
+            row = await asyncio.to_thread(self._disk_get, key)
+            if row is not None:
+                entry = (row[0], row[1])
+                with self._lock:
+                    self._memory[key] = entry
+        
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return entry[0]
+    
+    async def set(self, key: str, value: str) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._memory[key] = (value, expires_at)
+        
+        if self.db_path:
+            await asyncio.to_thread(self._disk_set, key, value, expires_at)
+    
+    def _disk_clear(self) -> None:
+        with self._db_lock:
+            db = self._connect()
+            db.execute("DELETE FROM response_cache")
+            db.commit()
+    
+    async def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.db_path:
+            await asyncio.to_thread(self._disk_clear)
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._memory),
+            "max_entries": self._memory.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "persistent": bool(self.db_path),
+        }
+
+
+# Guest response cache
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    db_path=settings.RESPONSE_CACHE_DB_PATH
+)
@@ -0,0 +1,139 @@
+import html
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import DateTime, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+SNIPPET_WORDS = 12
+
+# Private-use characters the database wraps matches in; the snippet text is
+# HTML-escaped first and only then are these turned into highlight tags
+_MATCH_START = "\ue000"
+_MATCH_END = "\ue001"
+
+
+class SearchNotSupported(Exception):
+    """Full-text search isn't available on this database (mapped to 501 by the routes)"""
+
+
+def _highlight(snippet: Optional[str]) -> Optional[str]:
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(_MATCH_START, HIGHLIGHT_START).replace(_MATCH_END, HIGHLIGHT_END)
+
+
+def _fts5_query(query: str) -> str:
+    """Quote each term for FTS5 MATCH (prefix match, all terms required)"""
+    terms = re.findall(r"\w+", query)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _dialect(db: AsyncSession) -> str:
+    return db.get_bind().dialect.name
+
+
+# SQLite FTS5: bm25() is lower-is-better, so negate it for the score
+_SQLITE_MESSAGES = text(f"""
+    SELECT m.id AS message_id, m.chat_id, c.title AS chat_title, m.role, m.created_at,
+           snippet(messages_fts, 0, :match_start, :match_end, '…', {SNIPPET_WORDS}) AS snippet,
+           -bm25(messages_fts) AS score
+    FROM messages_fts
+    JOIN messages m ON m.id = messages_fts.rowid
+    JOIN chats c ON c.id = m.chat_id
+    WHERE messages_fts MATCH :query AND c.user_id = :user_id
+    ORDER BY bm25(messages_fts)
+    LIMIT :limit OFFSET :offset
+""").columns(created_at=DateTime)
+
+_SQLITE_CHATS = text("""
+    SELECT chat_id, MAX(score) AS score FROM (
+        SELECT c.id AS chat_id, -bm25(chats_fts) AS score
+        FROM chats_fts JOIN chats c ON c.id = chats_fts.rowid
+        WHERE chats_fts MATCH :query AND c.user_id = :user_id
+        UNION ALL
+        SELECT m.chat_id, -bm25(messages_fts) AS score
+        FROM messages_fts
+        JOIN messages m ON m.id = messages_fts.rowid
+        JOIN chats c ON c.id = m.chat_id
+        WHERE messages_fts MATCH :query AND c.user_id = :user_id
+    ) AS hits
+    GROUP BY chat_id
+    ORDER BY score DESC, chat_id DESC
+    LIMIT :limit OFFSET :offset
+""")
+
+_POSTGRES_MESSAGES = text("""
+    SELECT m.id AS message_id, m.chat_id, c.title AS chat_title, m.role, m.created_at,
+           ts_headline('english', m.content, q, :headline_options) AS snippet,
+           ts_rank(m.search_vector, q) AS score
+    FROM messages m
+    JOIN chats c ON c.id = m.chat_id,
+         websearch_to_tsquery('english', :query) AS q
+    WHERE c.user_id = :user_id AND m.search_vector @@ q
+    ORDER BY score DESC, m.id DESC
+    LIMIT :limit OFFSET :offset
+""").columns(created_at=DateTime)
+
+_POSTGRES_CHATS = text("""
+    SELECT chat_id, MAX(score) AS score FROM (
+        SELECT c.id AS chat_id, ts_rank(c.search_vector, q) AS score
+        FROM chats c, websearch_to_tsquery('english', :query) AS q
+        WHERE c.user_id = :user_id AND c.search_vector @@ q
+        UNION ALL
+        SELECT m.chat_id, ts_rank(m.search_vector, q) AS score
+        FROM messages m
+        JOIN chats c ON c.id = m.chat_id,
+             websearch_to_tsquery('english', :query) AS q
+        WHERE c.user_id = :user_id AND m.search_vector @@ q
+    ) AS hits
+    GROUP BY chat_id
+    ORDER BY score DESC, chat_id DESC
+    LIMIT :limit OFFSET :offset
+""")
+
+
+def _params(db: AsyncSession, query: str, user_id: int, limit: int, offset: int) -> Tuple[str, Dict[str, Any]]:
+    dialect = _dialect(db)
+    if dialect == "sqlite":
+        query = _fts5_query(query)
+    elif dialect != "postgresql":
+        raise SearchNotSupported(f"Full-text search is not supported on {dialect}")
+    
+    return dialect, {"query": query, "user_id": user_id, "limit": limit, "offset": offset}
+
+
+async def search_messages(db: AsyncSession, user_id: int, query: str, limit: int, offset: int = 0) -> List[Dict[str, Any]]:
+    """Ranked message matches with highlighted snippets, most relevant first"""
+    dialect, params = _params(db, query, user_id, limit, offset)
+    if not params["query"]:
+        return []
+    
+    if dialect == "sqlite":
+        statement = _SQLITE_MESSAGES
+        params.update(match_start=_MATCH_START, match_end=_MATCH_END)
+    else:
+        statement = _POSTGRES_MESSAGES
+        params["headline_options"] = (
+            f"StartSel={_MATCH_START}, StopSel={_MATCH_END}, "
+            f"MaxWords={SNIPPET_WORDS * 2}, MinWords={SNIPPET_WORDS}"
+        )
+    
+    result = await db.execute(statement, params)
+    return [
+        {**row._mapping, "snippet": _highlight(row.snippet)}
+        for row in result
+    ]
+
+
+async def search_chat_ids(db: AsyncSession, user_id: int, query: str, limit: int, offset: int = 0) -> List[int]:
+    """Ids of chats whose title or messages match, most relevant first"""
+    dialect, params = _params(db, query, user_id, limit, offset)
+    if not params["query"]:
+        return []
+    
+    statement = _SQLITE_CHATS if dialect == "sqlite" else _POSTGRES_CHATS
+    result = await db.execute(statement, params)
+    return [row.chat_id for row in result]
@@ -0,0 +1,142 @@
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.admission import Priority, admission_controller
+from app.core.config import settings
+from app.core.logging import logger
+from app.db.session import AsyncSessionLocal
+from app.models.chat import Chat
+from app.models.message import Message
+from app.services.chatbot_service import get_ai_response
+
+# Chats with a summary update in progress (per worker)
+_summarizing: Set[int] = set()
+
+
+def build_system_prompt(chat_summary: Optional[str]) -> str:
+    """System prompt for a chat, including the rolling summary when there is one"""
+    if not chat_summary:
+        return settings.SYSTEM_PROMPT
+    
+    return f"{settings.SYSTEM_PROMPT}\n\nSummary of the earlier conversation:\n{chat_summary}"
+
+
+def summary_keep_recent(window_length: int, sent: int) -> Optional[int]:
+    """
+    Newest messages to leave out of a summary update after an exchange, or
+    None when no update is due
+    
+    `window_length` unsummarized messages were fetched for the prompt (the
+    new one included) and the newest `sent` of them fit the token budget.
+    Older turns are folded in, SUMMARY_BATCH_MESSAGES at a time, before the
+    next prompt's window would have to drop one, and right away once the
+    token budget already did.
+    """
+    if not settings.SUMMARY_ENABLED:
+        return None
+    
+    keep_recent = max(settings.MAX_CONTEXT_MESSAGES - settings.SUMMARY_BATCH_MESSAGES, 2)
+    if sent < window_length:
+        return min(sent + 1, keep_recent)
+    # The reply is stored too, and the next prompt carries MAX_CONTEXT_MESSAGES - 1 stored messages
+    if window_length + 1 > settings.MAX_CONTEXT_MESSAGES - 1:
+        return keep_recent
+    return None
+
+
+async def _pending_messages(db: AsyncSession, chat: Chat, keep_recent: int) -> List[Dict[str, str]]:
+    """Messages older than the newest `keep_recent` that the summary doesn't cover yet"""
+    result = await db.execute(
+        select(Message.id)
+        .where(Message.chat_id == chat.id)
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .offset(max(keep_recent, 1) - 1)
+        .limit(1)
+    )
+    window_start_id = result.scalar()
+    
+    if window_start_id is None:
+        return []
+    
+    result = await db.execute(
+        select(Message.id, Message.role, Message.content)
+        .where(
+            Message.chat_id == chat.id,
+            Message.id > (chat.summary_message_id or 0),
+            Message.id < window_start_id
+        )
+        .order_by(Message.id)
+        .limit(settings.SUMMARY_MAX_INPUT_MESSAGES)
+    )
+    
+    return [{"id": row.id, "role": row.role, "content": row.content} for row in result]
+
+
+async def generate_summary(previous_summary: Optional[str], messages: List[Dict[str, str]]) -> str:
+    """Fold new messages into the previous summary"""
+    transcript = "\n\n".join(
+        f"{'User' if msg['role'] == 'user' else 'Assistant'}: {msg['content']}"
+        for msg in messages
+    )
+    prompt = [
+        {"role": "system", "content": settings.SUMMARY_PROMPT},
+        {
+            "role": "user",
+            "content": f"Current summary:\n{previous_summary or '(none)'}\n\nNew messages:\n{transcript}"
+        },
+    ]
+    
+    # Lowest priority: summaries are shed first when chat traffic needs the slots
+    async with admission_controller.slot(Priority.BACKGROUND):
+        return await get_ai_response(
+            prompt,
+            generation_config={
+                "temperature": 0.2,
+                "max_output_tokens": settings.SUMMARY_MAX_TOKENS,
+            }
+        )
+
+
+async def update_chat_summary(chat_id: int, keep_recent: int) -> None:
+    """
+    Fold the turns older than the newest `keep_recent` messages into the
+    chat's rolling summary
+    
+    Runs as a background task after a message exchange, with its own session.
+    """
+    if chat_id in _summarizing:
+        return
+    
+    _summarizing.add(chat_id)
+    db = AsyncSessionLocal()
+    try:
+        chat = await db.get(Chat, chat_id)
+        if chat is None:
+            return
+        
+        pending = await _pending_messages(db, chat, keep_recent)
+        # Don't keep the read transaction (and its connection) open during the LLM call
+        await db.commit()
+        if not pending:
+            return
+        
+        summary = await generate_summary(chat.summary, pending)
+        summary_message_id = pending[-1]["id"]
+        # Core UPDATE so Chat.updated_at's onupdate doesn't reorder the chat list
+        await db.execute(
+            update(Chat)
+            .where(Chat.id == chat_id)
+            .values(summary=summary, summary_message_id=summary_message_id, updated_at=Chat.updated_at)
+        )
+        await db.commit()
+        
+        logger.info(f"Chat {chat_id}: Summary updated through message {summary_message_id}")
+        
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Chat {chat_id}: Summary update failed - {str(e)}")
+    finally:
+        await db.close()
+        _summarizing.discard(chat_id)
@@ -1,5 +1,5 @@
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
 class ConversationContextManager:  
    
@@ -35,4 +35,45 @@ class ConversationContextManager:
     @staticmethod
     def estimate_tokens(messages: List[Dict[str, str]]) -> int:
         total_chars = sum(len(m.get("content", "")) for m in messages)
-        return total_chars // 4
\ No newline at end of file
+        return total_chars // 4
+    
+    @staticmethod
+    def estimate_text_tokens(text: str) -> int:
+        # ~4 characters per token, rounded up so no message counts as free
+        return (len(text) + 3) // 4
+    
+    @staticmethod
+    def build_budgeted_context(
+        messages: List[Dict[str, Any]],
+        system_prompt: str,
+        token_budget: int,
+        reserved_output_tokens: int
+    ) -> Tuple[List[Dict[str, str]], int]:
+        """
+        Pack the newest messages into a token budget
+        
+        `messages` are in conversation order and may carry a precomputed
+        `token_count`. Room is always reserved for the system prompt and the
+        model output; the newest message is always kept.
+        
+        Returns:
+            Tuple of (messages with system prompt first, estimated input tokens)
+        """
+        system_tokens = ConversationContextManager.estimate_text_tokens(system_prompt)
+        available = token_budget - reserved_output_tokens - system_tokens
+        
+        selected = []
+        used = 0
+        for msg in reversed(messages):
+            cost = msg.get("token_count")
+            if cost is None:
+                cost = ConversationContextManager.estimate_text_tokens(msg["content"])
+            
+            if selected and used + cost > available:
+                break
+            
+            used += cost
+            selected.append({"role": msg["role"], "content": msg["content"]})
+        
+        selected.reverse()
+        return [{"role": "system", "content": system_prompt}] + selected, system_tokens + used
\ No newline at end of file
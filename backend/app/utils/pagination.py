@@ -0,0 +1,90 @@
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import Select, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+class KeysetPage(NamedTuple):
+    items: List[Any]  # Newest first
+    next_cursor: Optional[str]  # Pass as `before` for older items
+    prev_cursor: Optional[str]  # Pass as `after` for newer items
+
+
+def encode_cursor(timestamp: datetime, item_id: int) -> str:
+    raw = json.dumps([timestamp.isoformat(), item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(timestamp), int(item_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+
+async def keyset_page(
+    db: AsyncSession,
+    statement: Select,
+    timestamp_column: Any,
+    id_column: Any,
+    key: Callable[[Any], Tuple[datetime, int]],
+    limit: int,
+    before: Optional[str] = None,
+    after: Optional[str] = None
+) -> KeysetPage:
+    """
+    Fetch one page of `statement` ordered newest first on (timestamp, id)
+    
+    `before` returns items older than the cursor, `after` items newer than it.
+    Without a cursor the newest `limit` items are returned.
+    """
+    if before and after:
+        raise InvalidCursorError("Use either 'before' or 'after', not both")
+    
+    if after:
+        timestamp, item_id = decode_cursor(after)
+        result = await db.execute(statement.where(or_(
+            timestamp_column > timestamp,
+            and_(timestamp_column == timestamp, id_column > item_id)
+        )).order_by(timestamp_column.asc(), id_column.asc()).limit(limit + 1))
+        rows = result.scalars().all()
+        
+        has_newer = len(rows) > limit
+        items = list(reversed(rows[:limit]))
+        
+        return KeysetPage(
+            items=items,
+            next_cursor=encode_cursor(*key(items[-1])) if items else None,
+            prev_cursor=encode_cursor(*key(items[0])) if items and has_newer else None
+        )
+    
+    if before:
+        timestamp, item_id = decode_cursor(before)
+        statement = statement.where(or_(
+            timestamp_column < timestamp,
+            and_(timestamp_column == timestamp, id_column < item_id)
+        ))
+    
+    result = await db.execute(
+        statement.order_by(timestamp_column.desc(), id_column.desc()).limit(limit + 1)
+    )
+    rows = result.scalars().all()
+    
+    has_older = len(rows) > limit
+    items = rows[:limit]
+    
+    return KeysetPage(
+        items=items,
+        next_cursor=encode_cursor(*key(items[-1])) if items and has_older else None,
+        prev_cursor=encode_cursor(*key(items[0])) if items and before else None
+    )
@@ -0,0 +1,304 @@
+"""
+End-to-end load benchmark for the Quizbot API
+
+Drives app.main:app in-process (httpx ASGITransport) or through a local
+uvicorn server, against the fake LLM provider (LLM_PROVIDER=fake) with a
+configurable latency distribution, error rate and chunk cadence. Each virtual
+user registers, logs in, creates a chat and then repeatedly lists chats,
+opens the chat, sends a message, sends a guest message and searches.
+
+Run from the backend directory:
+
+    python -m benchmarks.load_test --users 20 --iterations 10 --output results.json
+    python -m benchmarks.load_test --baseline benchmarks/baseline.json
+
+Exits with status 1 when a p95 latency regresses past the baseline tolerance.
+
+benchmarks/baseline.json was produced with the defaults on the temporary
+SQLite database:
+
+    python -m benchmarks.load_test --output benchmarks/baseline.json
+
+Regenerate it on the machine that runs the comparison (absolute numbers
+don't transfer between machines).
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+GUEST_PROMPTS = [f"Explain topic number {i} in one paragraph" for i in range(20)]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Quizbot API load benchmark")
+    parser.add_argument("--mode", choices=["asgi", "uvicorn"], default="asgi",
+                        help="Call the app in-process or over a local uvicorn server")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=5, help="Scenario loops per user")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="Fake LLM mean time to first chunk")
+    parser.add_argument("--llm-spread-ms", type=float, default=50.0, help="Fake LLM latency std dev / half-width")
+    parser.add_argument("--llm-distribution", choices=["fixed", "uniform", "normal", "lognormal"], default="normal")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Fraction of fake LLM calls that fail")
+    parser.add_argument("--llm-chunk-interval-ms", type=float, default=30.0, help="Delay between streamed chunks")
+    parser.add_argument("--stream", action="store_true", help="Use the SSE endpoint for chat messages")
+    parser.add_argument("--database-url", default=None,
+                        help="Database to benchmark against (default: a fresh temporary SQLite file)")
+    parser.add_argument("--bcrypt-rounds", type=int, default=4,
+                        help="Lower than production so registration doesn't dominate the run")
+    parser.add_argument("--rate-limit", action="store_true",
+                        help="Keep rate limiting on (all virtual guests share one IP, so it is off by default)")
+    parser.add_argument("--port", type=int, default=8765, help="Port for --mode uvicorn")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Write JSON results here (default: stdout)")
+    parser.add_argument("--baseline", default=None, help="Compare p95 latencies against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.20,
+                        help="Allowed p95 slowdown vs baseline before failing (0.20 = 20%%)")
+    parser.add_argument("--slack-ms", type=float, default=25.0,
+                        help="Absolute p95 slowdown always allowed, so jitter on fast endpoints doesn't fail")
+    parser.add_argument("--min-samples", type=int, default=20,
+                        help="Skip the p95 check for endpoints with fewer requests than this")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Settings are read at import time, so this must run before importing app"""
+    if args.database_url is None:
+        db_path = Path(tempfile.mkdtemp(prefix="quizbot-bench-")) / "bench.db"
+        args.database_url = f"sqlite:///{db_path}"
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    os.environ["DB_ECHO"] = "false"
+    os.environ["LOG_FILE"] = ""
+    os.environ["RATE_LIMIT_ENABLED"] = "true" if args.rate_limit else "false"
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+    os.environ["FAKE_LLM_LATENCY_SPREAD_MS"] = str(args.llm_spread_ms)
+    os.environ["FAKE_LLM_LATENCY_DISTRIBUTION"] = args.llm_distribution
+    os.environ["FAKE_LLM_ERROR_RATE"] = str(args.llm_error_rate)
+    os.environ["FAKE_LLM_CHUNK_INTERVAL_MS"] = str(args.llm_chunk_interval_ms)
+    os.environ["FAKE_LLM_SEED"] = str(args.seed)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class Recorder:
+    """Collects per-endpoint latencies and errors"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def call(self, name: str, request, expected: int = 200):
+        start = time.perf_counter()
+        try:
+            response = await request
+        except Exception:
+            self.errors[name] += 1
+            return None
+        self.latencies[name].append(time.perf_counter() - start)
+        if response.status_code != expected:
+            self.errors[name] += 1
+            return None
+        return response
+
+    def summary(self, wall_seconds: float) -> Dict[str, Dict]:
+        endpoints = {}
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            values = sorted(self.latencies.get(name, []))
+            endpoints[name] = {
+                "count": len(values),
+                "errors": self.errors.get(name, 0),
+                "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+                "p50_ms": round(percentile(values, 50) * 1000, 3),
+                "p95_ms": round(percentile(values, 95) * 1000, 3),
+                "p99_ms": round(percentile(values, 99) * 1000, 3),
+                "throughput_rps": round(len(values) / wall_seconds, 3) if wall_seconds else 0.0,
+            }
+        return endpoints
+
+
+async def run_user(client, recorder: Recorder, user_index: int, args: argparse.Namespace) -> None:
+    email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+    password = "benchmark-password"
+
+    await recorder.call("register", client.post(
+        "/api/v1/users/register", json={"name": f"Bench User {user_index}", "email": email, "password": password}
+    ), expected=201)
+    response = await recorder.call("login", client.post(
+        "/api/v1/users/login", json={"email": email, "password": password}
+    ))
+    if response is None:
+        return
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = await recorder.call("create_chat", client.post(
+        "/api/v1/chats", json={"title": "Benchmark chat"}, headers=headers
+    ), expected=201)
+    if response is None:
+        return
+    chat_id = response.json()["id"]
+
+    for i in range(args.iterations):
+        await recorder.call("list_chats", client.get("/api/v1/chats", params={"limit": 20}, headers=headers))
+        await recorder.call("open_chat", client.get(f"/api/v1/chats/{chat_id}", params={"limit": 50}, headers=headers))
+
+        content = f"Question {i} from user {user_index} about photosynthesis"
+        if args.stream:
+            await recorder.call("send_message_stream", client.post(
+                f"/api/v1/chats/{chat_id}/messages/stream", json={"content": content}, headers=headers
+            ))
+        else:
+            await recorder.call("send_message", client.post(
+                f"/api/v1/chats/{chat_id}/messages", json={"content": content}, headers=headers
+            ), expected=201)
+
+        prompt = GUEST_PROMPTS[(user_index + i) % len(GUEST_PROMPTS)]
+        await recorder.call("guest_message", client.post(
+            "/api/v1/chats/guest/message", json={"content": prompt}
+        ), expected=201)
+        await recorder.call("search_messages", client.get(
+            "/api/v1/chats/search/messages", params={"q": "photosynthesis", "limit": 20}, headers=headers
+        ))
+
+
+def start_uvicorn(app, port: int):
+    """Serve the (already patched) app from a background thread"""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict:
+    import httpx
+
+    # The ASGI transport never runs the lifespan, which is where the app sets this up
+    from app.core.logging import setup_logging
+    setup_logging()
+    # One line per benchmark request would drown out the app's own logs
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    from app.db.migrations import run_migrations
+    run_migrations(args.database_url)
+
+    from app.db.session import async_engine
+    from app.main import app
+
+    server = None
+    if args.mode == "uvicorn":
+        server, thread = start_uvicorn(app, args.port)
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=120)
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120)
+
+    recorder = Recorder()
+    start = time.perf_counter()
+    try:
+        async with client:
+            await asyncio.gather(*(run_user(client, recorder, i, args) for i in range(args.users)))
+    finally:
+        if server is not None:
+            server.should_exit = True
+            thread.join(timeout=10)
+    wall_seconds = time.perf_counter() - start
+    await async_engine.dispose()
+
+    endpoints = recorder.summary(wall_seconds)
+    total_requests = sum(e["count"] for e in endpoints.values())
+    return {
+        "config": {
+            "mode": args.mode,
+            "users": args.users,
+            "iterations": args.iterations,
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_spread_ms": args.llm_spread_ms,
+            "llm_distribution": args.llm_distribution,
+            "llm_error_rate": args.llm_error_rate,
+            "llm_chunk_interval_ms": args.llm_chunk_interval_ms,
+            "stream": args.stream,
+            "database": args.database_url.split(":", 1)[0],
+            "python": sys.version.split()[0],
+        },
+        "wall_seconds": round(wall_seconds, 3),
+        "total_requests": total_requests,
+        "total_errors": sum(e["errors"] for e in endpoints.values()),
+        "throughput_rps": round(total_requests / wall_seconds, 3) if wall_seconds else 0.0,
+        "endpoints": endpoints,
+    }
+
+
+def compare_to_baseline(
+    results: Dict,
+    baseline: Dict,
+    tolerance: float,
+    slack_ms: float = 0.0,
+    min_samples: int = 0
+) -> List[str]:
+    """Endpoints whose p95 (or error count) got worse than the baseline allows"""
+    regressions = []
+    for name, current in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if previous is None:
+            continue
+        limit = max(previous["p95_ms"] * (1 + tolerance), previous["p95_ms"] + slack_ms)
+        if current["count"] >= min_samples and current["p95_ms"] > limit:
+            regressions.append(
+                f"{name}: p95 {current['p95_ms']}ms > {previous['p95_ms']}ms baseline (+{int(tolerance * 100)}% allowed)"
+            )
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{name}: {current['errors']} errors vs {previous['errors']} in baseline")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    configure_environment(args)
+
+    if not args.output:
+        # Keep app logging out of stdout so the JSON stays machine-readable
+        logging.disable(logging.CRITICAL)
+
+    results = asyncio.run(run_benchmark(args))
+
+    exit_code = 0
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare_to_baseline(results, baseline, args.tolerance, args.slack_ms, args.min_samples)
+        results["regressions"] = regressions
+        if regressions:
+            exit_code = 1
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+    for regression in results.get("regressions", []):
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
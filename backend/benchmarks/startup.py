@@ -0,0 +1,222 @@
+"""
+Cold start benchmark for the Quizbot API
+
+Each run starts a fresh interpreter and measures, in order:
+- how long `import app.main` takes, and which heavy modules it loaded;
+- how long the lifespan startup takes (what uvicorn waits for before
+  accepting connections);
+- the latency of the first request, and of a second one for comparison.
+
+The fake LLM provider and a temporary SQLite database are used, so no
+network access is needed. Run from the backend directory:
+
+    python -m benchmarks.startup --runs 5 --output startup.json
+    python -m benchmarks.startup --baseline benchmarks/startup_baseline.json
+
+Exits with status 1 when a median regresses past the baseline tolerance, or
+when a heavy module that the baseline did not load is now loaded at import.
+
+benchmarks/startup_baseline.json was produced with the defaults above:
+
+    python -m benchmarks.startup --runs 5 --output benchmarks/startup_baseline.json
+
+Regenerate it on the machine that runs the comparison; absolute numbers
+don't transfer between machines.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Dependencies that should only be imported on first use
+HEAVY_MODULES = ("google.generativeai", "google.ai.generativelanguage", "grpc", "PIL", "alembic")
+
+TIMINGS = ("process_ms", "import_ms", "startup_ms", "first_request_ms", "second_request_ms")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Quizbot API cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to start")
+    parser.add_argument("--path", default="/health", help="GET path used for the first request")
+    parser.add_argument("--warm-up", choices=["background", "blocking", "off"], default="background",
+                        help="LLM_WARM_UP for the app under test")
+    parser.add_argument("--database-url", default=None,
+                        help="Database to start against (default: a fresh temporary SQLite file)")
+    parser.add_argument("--output", default=None, help="Write JSON results here (default: stdout)")
+    parser.add_argument("--baseline", default=None, help="Compare medians against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed median slowdown vs baseline before failing (0.25 = 25%%)")
+    parser.add_argument("--slack-ms", type=float, default=5.0,
+                        help="Absolute slowdown always allowed, so millisecond timings don't fail on jitter")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def child_environment(args: argparse.Namespace) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": args.database_url,
+        "LLM_PROVIDER": "fake",
+        "LLM_WARM_UP": args.warm_up,
+        "LOG_FILE": "",
+        "DB_ECHO": "false",
+        "PYTHONDONTWRITEBYTECODE": "1",
+    })
+    return env
+
+
+def measure_child(path: str) -> Dict:
+    """Runs inside the fresh interpreter; only the stdlib is loaded before timing starts"""
+    import asyncio
+    import logging
+
+    # Keep app logging out of stdout so the JSON stays machine-readable
+    logging.disable(logging.CRITICAL)
+
+    start = time.perf_counter()
+    from app.main import app
+    import_ms = (time.perf_counter() - start) * 1000
+    heavy = sorted(name for name in HEAVY_MODULES if name in sys.modules)
+
+    async def serve() -> Dict:
+        import httpx
+
+        from app.db.session import async_engine
+
+        start = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            startup_ms = (time.perf_counter() - start) * 1000
+
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                start = time.perf_counter()
+                first = await client.get(path)
+                first_ms = (time.perf_counter() - start) * 1000
+
+                start = time.perf_counter()
+                await client.get(path)
+                second_ms = (time.perf_counter() - start) * 1000
+        await async_engine.dispose()
+
+        return {
+            "startup_ms": startup_ms,
+            "first_request_ms": first_ms,
+            "second_request_ms": second_ms,
+            "status": first.status_code,
+        }
+
+    result = asyncio.run(serve())
+    result.update({"import_ms": import_ms, "heavy_modules_at_import": heavy})
+    return result
+
+
+def run_once(args: argparse.Namespace) -> Dict:
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child", "--path", args.path],
+        env=child_environment(args),
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    process_ms = (time.perf_counter() - start) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"Startup run failed:\n{completed.stderr}")
+
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["process_ms"] = process_ms
+    return result
+
+
+def summarize(runs: List[Dict]) -> Dict:
+    timings = {}
+    for name in TIMINGS:
+        values = [run[name] for run in runs]
+        timings[name] = {
+            "median": round(statistics.median(values), 3),
+            "min": round(min(values), 3),
+            "max": round(max(values), 3),
+        }
+    return timings
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, tolerance: float, slack_ms: float = 0.0) -> List[str]:
+    """Timings whose median got worse than the baseline allows, and newly eager heavy imports"""
+    regressions = []
+    for name, current in results["timings"].items():
+        previous = baseline.get("timings", {}).get(name)
+        if previous is None:
+            continue
+        limit = max(previous["median"] * (1 + tolerance), previous["median"] + slack_ms)
+        if current["median"] > limit:
+            regressions.append(
+                f"{name}: median {current['median']}ms > {previous['median']}ms baseline "
+                f"(+{int(tolerance * 100)}% allowed)"
+            )
+
+    new_modules = set(results["heavy_modules_at_import"]) - set(baseline.get("heavy_modules_at_import", []))
+    for name in sorted(new_modules):
+        regressions.append(f"{name} is now imported with app.main")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure_child(args.path)))
+        return 0
+
+    if args.database_url is None:
+        db_path = Path(tempfile.mkdtemp(prefix="quizbot-startup-")) / "startup.db"
+        args.database_url = f"sqlite:///{db_path}"
+        # Migrate once up front; the app never creates tables itself
+        subprocess.run(
+            [sys.executable, "-m", "app.db.migrations"],
+            env=child_environment(args),
+            capture_output=True,
+            check=True,
+        )
+
+    runs = [run_once(args) for _ in range(args.runs)]
+
+    results = {
+        "config": {
+            "runs": args.runs,
+            "path": args.path,
+            "warm_up": args.warm_up,
+            "database": args.database_url.split(":", 1)[0],
+            "python": sys.version.split()[0],
+        },
+        "timings": summarize(runs),
+        "heavy_modules_at_import": sorted({name for run in runs for name in run["heavy_modules_at_import"]}),
+        "first_request_status": runs[0]["status"],
+    }
+
+    exit_code = 0
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare_to_baseline(results, baseline, args.tolerance, args.slack_ms)
+        results["regressions"] = regressions
+        if regressions:
+            exit_code = 1
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+    for regression in results.get("regressions", []):
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
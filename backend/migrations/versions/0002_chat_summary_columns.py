@@ -0,0 +1,47 @@
+"""Chat read model: message_count and last_message_preview
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('chats', sa.Column('message_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('chats', sa.Column('last_message_preview', sa.String(length=200), nullable=True))
+
+    # Backfill from existing messages
+    op.execute(
+        """
+        UPDATE chats SET
+            message_count = (
+                SELECT COUNT(*) FROM messages WHERE messages.chat_id = chats.id
+            ),
+            last_message_preview = (
+                SELECT SUBSTR(messages.content, 1, 200) FROM messages
+                WHERE messages.chat_id = chats.id
+                ORDER BY messages.created_at DESC, messages.id DESC
+                LIMIT 1
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('chats') as batch_op:
+        batch_op.drop_column('last_message_preview')
+        batch_op.drop_column('message_count')
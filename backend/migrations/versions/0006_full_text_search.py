@@ -0,0 +1,112 @@
+"""Full-text search over message content and chat titles
+
+SQLite: external-content FTS5 tables kept in sync by triggers.
+Postgres: generated tsvector columns with GIN indexes. Adding a STORED
+generated column rewrites messages and chats under an ACCESS EXCLUSIVE lock
+(reads and writes wait for the rewrite, which is proportional to table size),
+so schedule this revision for a quiet window on large databases. The GIN
+indexes are then built CONCURRENTLY and don't block writes.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (fts table, source table, indexed column)
+SQLITE_FTS = [
+    ('messages_fts', 'messages', 'content'),
+    ('chats_fts', 'chats', 'title'),
+]
+
+
+def _sqlite_upgrade() -> None:
+    for fts, table, column in SQLITE_FTS:
+        op.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5("
+            f"{column}, content='{table}', content_rowid='id', tokenize='porter unicode61')"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {column} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); "
+            f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END"
+        )
+        # Index existing rows
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def _sqlite_downgrade() -> None:
+    for fts, _, _ in SQLITE_FTS:
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+# (index, table, generated column expression)
+POSTGRESQL_SEARCH_VECTORS = [
+    ('ix_messages_search_vector', 'messages', "to_tsvector('english', coalesce(content, ''))"),
+    ('ix_chats_search_vector', 'chats', "to_tsvector('english', coalesce(title, ''))"),
+]
+
+
+def _postgresql_upgrade() -> None:
+    for _, table, expression in POSTGRESQL_SEARCH_VECTORS:
+        # Rewrites the table (see module docstring)
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ({expression}) STORED"
+        )
+
+    # Don't lock writes on large tables while the indexes build
+    with op.get_context().autocommit_block():
+        for name, table, _ in POSTGRESQL_SEARCH_VECTORS:
+            op.create_index(
+                name, table, ['search_vector'],
+                postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def _postgresql_downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in POSTGRESQL_SEARCH_VECTORS:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+    for _, table, _ in POSTGRESQL_SEARCH_VECTORS:
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        _sqlite_upgrade()
+    elif dialect == 'postgresql':
+        _postgresql_upgrade()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        _sqlite_downgrade()
+    elif dialect == 'postgresql':
+        _postgresql_downgrade()
@@ -0,0 +1,83 @@
+"""
+Shared fixtures: the app on a temporary SQLite database with the fake LLM
+
+Settings are read at import time, so the environment is set up here, before
+any test module imports `app`.
+"""
+import os
+import tempfile
+import uuid
+from pathlib import Path
+
+import pytest
+
+_DB_DIR = Path(tempfile.mkdtemp(prefix="quizbot-tests-"))
+
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{_DB_DIR / 'test.db'}",
+    "LLM_PROVIDER": "fake",
+    "LLM_WARM_UP": "off",
+    "FAKE_LLM_LATENCY_DISTRIBUTION": "fixed",
+    "FAKE_LLM_LATENCY_MS": "0",
+    "FAKE_LLM_CHUNK_INTERVAL_MS": "0",
+    "BCRYPT_ROUNDS": "4",
+    "RATE_LIMIT_ENABLED": "false",
+    "RESPONSE_CACHE_DB_PATH": "",
+    "PROFILING_ENABLED": "false",
+    "LOG_FILE": "",
+    "DB_ECHO": "false",
+})
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    # Before migrating, so alembic doesn't add a second root handler
+    from app.core.logging import setup_logging
+    setup_logging()
+
+    from app.db.migrations import run_migrations
+    run_migrations()
+
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Register a fresh user and return its bearer auth header"""
+    response = client.post("/api/v1/users/register", json={
+        "name": "Test User",
+        "email": f"user-{uuid.uuid4().hex[:12]}@example.com",
+        "password": "test-password",
+    })
+    assert response.status_code == 201, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def chat_id(client, auth_headers):
+    """A chat with a few message exchanges"""
+    response = client.post("/api/v1/chats", json={"title": "Test chat"}, headers=auth_headers)
+    assert response.status_code == 201, response.text
+    chat_id = response.json()["id"]
+
+    for i in range(3):
+        response = client.post(
+            f"/api/v1/chats/{chat_id}/messages", json={"content": f"Question {i}"}, headers=auth_headers
+        )
+        assert response.status_code == 201, response.text
+    return chat_id
+
+
+@pytest.fixture
+def db(client):
+    """A sync session on the test database, for state the API can't set up"""
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    yield session
+    session.close()
@@ -0,0 +1,222 @@
+"""
+AdmissionController: slot handoff, cancellation, timeouts and shedding
+"""
+import asyncio
+
+import pytest
+
+from app.core.admission import AdmissionController, AdmissionRejected, Priority
+
+
+def make_controller(max_concurrency=1, max_queue=8, queue_timeout=1.0):
+    return AdmissionController(max_concurrency=max_concurrency, max_queue=max_queue, queue_timeout=queue_timeout)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_fast_path_admits_up_to_max_concurrency():
+    async def scenario():
+        controller = make_controller(max_concurrency=2)
+        first = await controller.acquire(Priority.INTERACTIVE)
+        second = await controller.acquire(Priority.INTERACTIVE)
+        assert controller.in_flight == 2
+
+        first.release()
+        second.release()
+        assert controller.in_flight == 0
+
+    run(scenario())
+
+
+def test_release_hands_slot_to_waiter_in_priority_order():
+    async def scenario():
+        controller = make_controller()
+        holder = await controller.acquire(Priority.INTERACTIVE)
+        order = []
+
+        async def wait(priority):
+            ticket = await controller.acquire(priority)
+            order.append(priority)
+            return ticket
+
+        background = asyncio.create_task(wait(Priority.BACKGROUND))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(wait(Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+        assert controller.queue_depth == 2
+
+        holder.release()
+        ticket = await interactive
+        assert order == [Priority.INTERACTIVE]
+        # The slot moved straight to the waiter
+        assert controller.in_flight == 1
+
+        ticket.release()
+        (await background).release()
+        assert order == [Priority.INTERACTIVE, Priority.BACKGROUND]
+        assert controller.in_flight == 0
+        assert controller.queue_depth == 0
+
+    run(scenario())
+
+
+def test_release_is_idempotent():
+    async def scenario():
+        controller = make_controller()
+        ticket = await controller.acquire(Priority.INTERACTIVE)
+        ticket.release()
+        ticket.release()
+        assert controller.in_flight == 0
+
+    run(scenario())
+
+
+def test_cancelled_waiter_leaves_queue_without_leaking_a_slot():
+    async def scenario():
+        controller = make_controller()
+        holder = await controller.acquire(Priority.INTERACTIVE)
+
+        waiter = asyncio.create_task(controller.acquire(Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+        assert controller.queue_depth == 1
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert controller.queue_depth == 0
+
+        holder.release()
+        assert controller.in_flight == 0
+        (await controller.acquire(Priority.INTERACTIVE)).release()
+
+    run(scenario())
+
+
+def test_waiter_cancelled_after_handoff_passes_the_slot_on():
+    async def scenario():
+        controller = make_controller()
+        holder = await controller.acquire(Priority.INTERACTIVE)
+
+        first = asyncio.create_task(controller.acquire(Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(controller.acquire(Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+
+        # Hand the slot to `first`, then cancel it before it resumes
+        holder.release()
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        ticket = await second
+        assert controller.in_flight == 1
+        ticket.release()
+        assert controller.in_flight == 0
+
+    run(scenario())
+
+
+def test_waiter_times_out_with_retry_after():
+    async def scenario():
+        controller = make_controller(queue_timeout=0.05)
+        holder = await controller.acquire(Priority.INTERACTIVE)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire(Priority.INTERACTIVE)
+        assert rejected.value.reason == "timeout"
+        assert rejected.value.retry_after > 0
+        assert controller.queue_depth == 0
+
+        holder.release()
+        assert controller.in_flight == 0
+
+    run(scenario())
+
+
+def test_full_queue_is_shed():
+    async def scenario():
+        controller = make_controller(max_queue=1)
+        holder = await controller.acquire(Priority.INTERACTIVE)
+        waiter = asyncio.create_task(controller.acquire(Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire(Priority.GUEST)
+        assert rejected.value.reason == "queue_full"
+
+        holder.release()
+        (await waiter).release()
+
+    run(scenario())
+
+
+def test_long_hold_time_alone_does_not_shed_when_slots_turn_over():
+    async def scenario():
+        # 8 slots held ~12 s each free up about every 1.5 s, well inside a 10 s deadline
+        controller = make_controller(max_concurrency=8, queue_timeout=10.0)
+        tickets = [await controller.acquire(Priority.INTERACTIVE) for _ in range(8)]
+        controller._hold_time = 12.0
+
+        waiter = asyncio.create_task(controller.acquire(Priority.INTERACTIVE))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+
+        tickets.pop().release()
+        (await waiter).release()
+        for ticket in tickets:
+            ticket.release()
+        assert controller.in_flight == 0
+
+    run(scenario())
+
+
+def test_deadline_shedding_when_expected_wait_exceeds_timeout():
+    async def scenario():
+        controller = make_controller(max_concurrency=1, queue_timeout=1.0)
+        holder = await controller.acquire(Priority.INTERACTIVE)
+        controller._hold_time = 5.0
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire(Priority.INTERACTIVE)
+        assert rejected.value.reason == "deadline"
+        assert rejected.value.retry_after == pytest.approx(5.0)
+
+        holder.release()
+
+    run(scenario())
+
+
+def test_disabled_controller_admits_everything():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=0, queue_timeout=0.01, enabled=False)
+        tickets = [await controller.acquire(Priority.BACKGROUND) for _ in range(5)]
+        for ticket in tickets:
+            ticket.release()
+        assert controller.in_flight == 0
+
+    run(scenario())
+
+
+def test_fast_path_ignores_waiters_that_already_got_a_slot():
+    async def scenario():
+        controller = make_controller(max_concurrency=2)
+        first = await controller.acquire(Priority.INTERACTIVE)
+        second = await controller.acquire(Priority.INTERACTIVE)
+        waiter = asyncio.create_task(controller.acquire(Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+
+        # Hand a slot to the waiter, then free another before the waiter resumes
+        first.release()
+        second.release()
+        assert controller.queue_depth == 1
+
+        ticket = await asyncio.wait_for(controller.acquire(Priority.INTERACTIVE), timeout=0.01)
+        assert controller.in_flight == 2
+
+        ticket.release()
+        (await waiter).release()
+        assert controller.in_flight == 0
+
+    run(scenario())
@@ -0,0 +1,59 @@
+"""
+Chat.message_count / last_message_preview kept in sync by the Message events
+"""
+from sqlalchemy import select
+
+from app.models.chat import Chat
+from app.models.message import PREVIEW_LENGTH, Message
+
+
+def get_chat(client, auth_headers, chat_id):
+    return client.get(f"/api/v1/chats/{chat_id}", headers=auth_headers).json()
+
+
+def test_counters_follow_inserts(client, auth_headers, chat_id):
+    chat = get_chat(client, auth_headers, chat_id)
+
+    assert chat["message_count"] == 6
+    assert chat["last_message_preview"] == chat["messages"][-1]["content"][:PREVIEW_LENGTH]
+
+    listed = client.get("/api/v1/chats", headers=auth_headers).json()["chats"][0]
+    assert listed["message_count"] == 6
+    assert listed["last_message_preview"] == chat["last_message_preview"]
+
+
+def test_preview_is_truncated(client, auth_headers, db):
+    chat_id = client.post("/api/v1/chats", json={"title": "Long"}, headers=auth_headers).json()["id"]
+    db.add(Message(chat_id=chat_id, role="user", content="x" * (PREVIEW_LENGTH + 50)))
+    db.commit()
+
+    assert get_chat(client, auth_headers, chat_id)["last_message_preview"] == "x" * PREVIEW_LENGTH
+
+
+def test_deleting_the_latest_message_restores_the_previous_preview(client, auth_headers, chat_id, db):
+    messages = db.scalars(
+        select(Message).where(Message.chat_id == chat_id).order_by(Message.created_at, Message.id)
+    ).all()
+    db.delete(messages[-1])
+    db.commit()
+
+    chat = get_chat(client, auth_headers, chat_id)
+    assert chat["message_count"] == 5
+    assert chat["last_message_preview"] == messages[-2].content[:PREVIEW_LENGTH]
+
+
+def test_deleting_every_message_clears_the_preview(client, auth_headers, chat_id, db):
+    for message in db.scalars(select(Message).where(Message.chat_id == chat_id)):
+        db.delete(message)
+    db.commit()
+
+    chat = get_chat(client, auth_headers, chat_id)
+    assert chat["message_count"] == 0
+    assert chat["last_message_preview"] is None
+
+
+def test_deleting_the_chat_removes_its_messages(client, auth_headers, chat_id, db):
+    assert client.delete(f"/api/v1/chats/{chat_id}", headers=auth_headers).status_code == 200
+
+    assert db.get(Chat, chat_id) is None
+    assert db.scalars(select(Message).where(Message.chat_id == chat_id)).first() is None
@@ -0,0 +1,54 @@
+"""
+ConversationContextManager.build_budgeted_context: packing the newest turns into a token budget
+"""
+from app.utils.context_manager import ConversationContextManager
+
+build = ConversationContextManager.build_budgeted_context
+
+
+def message(role, tokens, label):
+    return {"role": role, "content": label, "token_count": tokens}
+
+
+def test_everything_fits():
+    messages = [message("user", 10, "q1"), message("assistant", 10, "a1"), message("user", 10, "q2")]
+
+    context, tokens = build(messages, "sys", token_budget=1000, reserved_output_tokens=100)
+
+    assert context == [{"role": "system", "content": "sys"}] + [
+        {"role": m["role"], "content": m["content"]} for m in messages
+    ]
+    assert tokens == 30 + ConversationContextManager.estimate_text_tokens("sys")
+
+
+def test_oldest_turns_are_dropped_first():
+    messages = [message("user", 40, "q1"), message("assistant", 40, "a1"), message("user", 40, "q2")]
+    system_tokens = ConversationContextManager.estimate_text_tokens("sys")
+
+    context, tokens = build(messages, "sys", token_budget=100 + 80 + system_tokens, reserved_output_tokens=100)
+
+    assert [m["content"] for m in context] == ["sys", "a1", "q2"]
+    assert tokens == 80 + system_tokens
+
+
+def test_packing_stops_at_the_first_turn_that_does_not_fit():
+    # A small older turn is not pulled in past a big one, so the prompt stays contiguous
+    messages = [message("user", 1, "q1"), message("assistant", 500, "a1"), message("user", 10, "q2")]
+
+    context, _ = build(messages, "sys", token_budget=200, reserved_output_tokens=100)
+
+    assert [m["content"] for m in context] == ["sys", "q2"]
+
+
+def test_newest_message_is_kept_even_over_budget():
+    context, _ = build([message("user", 5000, "huge")], "sys", token_budget=1000, reserved_output_tokens=500)
+
+    assert [m["content"] for m in context] == ["sys", "huge"]
+
+
+def test_missing_token_counts_are_estimated():
+    messages = [{"role": "user", "content": "x" * 400}, {"role": "user", "content": "y" * 40, "token_count": None}]
+
+    _, tokens = build(messages, "", token_budget=1000, reserved_output_tokens=0)
+
+    assert tokens == 100 + 10
@@ -0,0 +1,52 @@
+"""
+Keyset pagination of chats and messages
+"""
+import pytest
+
+
+def test_message_pages_walk_back_through_the_chat(client, auth_headers, chat_id):
+    url = f"/api/v1/chats/{chat_id}"
+    everything = [m["id"] for m in client.get(url, headers=auth_headers).json()["messages"]]
+
+    first = client.get(url, params={"limit": 4}, headers=auth_headers).json()
+    assert [m["id"] for m in first["messages"]] == everything[-4:]
+    assert first["next_cursor"]
+    assert first["prev_cursor"] is None
+
+    second = client.get(url, params={"limit": 4, "before": first["next_cursor"]}, headers=auth_headers).json()
+    assert [m["id"] for m in second["messages"]] == everything[:2]
+    assert second["next_cursor"] is None
+
+    # And forward again from the older page
+    newer = client.get(url, params={"limit": 4, "after": second["prev_cursor"]}, headers=auth_headers).json()
+    assert [m["id"] for m in newer["messages"]] == everything[2:6]
+
+
+def test_chat_pages_are_newest_first_without_gaps(client, auth_headers):
+    created = [
+        client.post("/api/v1/chats", json={"title": f"Chat {i}"}, headers=auth_headers).json()["id"]
+        for i in range(5)
+    ]
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, **({"before": cursor} if cursor else {})}
+        page = client.get("/api/v1/chats", params=params, headers=auth_headers).json()
+        seen += [chat["id"] for chat in page["chats"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == list(reversed(created))
+
+
+@pytest.mark.parametrize("params", [
+    {"before": "not-a-cursor"},
+    {"after": "bm90LWpzb24"},
+    {"before": "WyIyMDI2LTAxLTAxVDAwOjAwOjAwIiwxXQ", "after": "WyIyMDI2LTAxLTAxVDAwOjAwOjAwIiwxXQ"},
+])
+def test_bad_cursor_is_a_400(client, auth_headers, chat_id, params):
+    for url in ("/api/v1/chats", f"/api/v1/chats/{chat_id}"):
+        response = client.get(url, params=params, headers=auth_headers)
+        assert response.status_code == 400, response.text
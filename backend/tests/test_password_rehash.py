@@ -0,0 +1,71 @@
+"""
+Login upgrades bcrypt hashes made with a different BCRYPT_ROUNDS
+"""
+import uuid
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.security import pwd_context
+from app.models.user import User
+
+PASSWORD = "test-password"
+
+
+def register(client):
+    email = f"rehash-{uuid.uuid4().hex[:12]}@example.com"
+    response = client.post("/api/v1/users/register", json={"name": "Rehash", "email": email, "password": PASSWORD})
+    assert response.status_code == 201, response.text
+    return email
+
+
+def stored_hash(db, email):
+    db.expire_all()
+    return db.scalars(select(User.password_hash).where(User.email == email)).one()
+
+
+def set_hash(db, email, password_hash):
+    db.scalars(select(User).where(User.email == email)).one().password_hash = password_hash
+    db.commit()
+
+
+def login(client, email, password=PASSWORD):
+    return client.post("/api/v1/users/login", json={"email": email, "password": password})
+
+
+def rounds(password_hash):
+    return int(password_hash.split("$")[2])
+
+
+def test_new_hashes_use_the_configured_rounds(client, db):
+    email = register(client)
+
+    assert rounds(stored_hash(db, email)) == settings.BCRYPT_ROUNDS
+
+
+def test_outdated_hash_is_upgraded_on_login(client, db):
+    email = register(client)
+    set_hash(db, email, pwd_context.hash(PASSWORD, rounds=settings.BCRYPT_ROUNDS + 1))
+
+    assert login(client, email).status_code == 200
+
+    upgraded = stored_hash(db, email)
+    assert rounds(upgraded) == settings.BCRYPT_ROUNDS
+    assert pwd_context.verify(PASSWORD, upgraded)
+
+
+def test_current_hash_is_left_alone(client, db):
+    email = register(client)
+    before = stored_hash(db, email)
+
+    assert login(client, email).status_code == 200
+    assert stored_hash(db, email) == before
+
+
+def test_failed_login_does_not_rehash(client, db):
+    email = register(client)
+    outdated = pwd_context.hash(PASSWORD, rounds=settings.BCRYPT_ROUNDS + 1)
+    set_hash(db, email, outdated)
+
+    assert login(client, email, "wrong-password").status_code == 401
+    assert stored_hash(db, email) == outdated
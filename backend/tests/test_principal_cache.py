@@ -0,0 +1,62 @@
+"""
+Authenticated principal cache: served from memory, invalidated when the user row changes
+"""
+from sqlalchemy import select
+
+from app.models.user import User
+from app.services.principal_cache import principal_cache
+
+
+def me(client, auth_headers):
+    response = client.get("/api/v1/users/me", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def load_user(db, user_id):
+    return db.scalars(select(User).where(User.id == user_id)).one()
+
+
+def test_principal_is_cached_after_the_first_request(client, auth_headers):
+    user_id = me(client, auth_headers)["id"]
+
+    assert principal_cache.get(user_id) is not None
+
+
+def test_update_invalidates_the_cached_principal(client, auth_headers, db):
+    user = load_user(db, me(client, auth_headers)["id"])
+
+    user.name = "Renamed User"
+    db.commit()
+
+    assert principal_cache.get(user.id) is None
+    assert me(client, auth_headers)["name"] == "Renamed User"
+
+
+def test_principal_cached_between_flush_and_commit_is_dropped_on_commit(client, auth_headers, db):
+    user = load_user(db, me(client, auth_headers)["id"])
+
+    user.name = "Committed Name"
+    db.flush()
+    # Another request re-caches the row as committed so far
+    assert me(client, auth_headers)["name"] == "Test User"
+    db.commit()
+
+    assert me(client, auth_headers)["name"] == "Committed Name"
+
+
+def test_rollback_keeps_the_cached_principal_valid(client, auth_headers, db):
+    user = load_user(db, me(client, auth_headers)["id"])
+
+    user.name = "Never Saved"
+    db.flush()
+    db.rollback()
+
+    assert me(client, auth_headers)["name"] == "Test User"
+
+
+def test_deleted_user_is_rejected(client, auth_headers, db):
+    db.delete(load_user(db, me(client, auth_headers)["id"]))
+    db.commit()
+
+    assert client.get("/api/v1/users/me", headers=auth_headers).status_code == 401
@@ -0,0 +1,48 @@
+"""
+Query budgets for the hot chat endpoints
+
+A failure here usually means an N+1 or an extra round trip crept into a
+route. Raise a budget only when the extra query is intended.
+"""
+from app.db.instrumentation import assert_max_queries
+
+# Statements per request, measured with the principal cache warm
+LIST_CHATS_BUDGET = 1
+OPEN_CHAT_BUDGET = 2
+SEND_MESSAGE_BUDGET = 8  # Two inserts (each bumping the chat counters), context window, timestamp, counter refresh
+
+
+def test_list_chats_query_budget(client, auth_headers, chat_id):
+    with assert_max_queries(LIST_CHATS_BUDGET):
+        response = client.get("/api/v1/chats", params={"limit": 20}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert [chat["id"] for chat in response.json()["chats"]] == [chat_id]
+
+
+def test_list_chats_query_count_is_independent_of_chat_count(client, auth_headers, chat_id):
+    for i in range(5):
+        client.post("/api/v1/chats", json={"title": f"Extra chat {i}"}, headers=auth_headers)
+
+    with assert_max_queries(LIST_CHATS_BUDGET):
+        response = client.get("/api/v1/chats", params={"limit": 20}, headers=auth_headers)
+
+    assert len(response.json()["chats"]) == 6
+
+
+def test_open_chat_query_budget(client, auth_headers, chat_id):
+    with assert_max_queries(OPEN_CHAT_BUDGET):
+        response = client.get(f"/api/v1/chats/{chat_id}", params={"limit": 50}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert len(response.json()["messages"]) == 6
+
+
+def test_send_message_query_budget(client, auth_headers, chat_id):
+    with assert_max_queries(SEND_MESSAGE_BUDGET):
+        response = client.post(
+            f"/api/v1/chats/{chat_id}/messages", json={"content": "One more question"}, headers=auth_headers
+        )
+
+    assert response.status_code == 201
+    assert response.json()["assistant_message"]["content"]
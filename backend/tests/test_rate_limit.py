@@ -0,0 +1,71 @@
+"""
+Rate limiting of the LLM-backed routes: 429 with Retry-After, and the X-RateLimit headers
+"""
+import pytest
+
+from app.core.config import settings
+from app.core.rate_limit import MemoryRateLimitStore, rate_limiter
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    """Enable the limiter with a fresh store; returns a setter for the per-minute budgets"""
+    monkeypatch.setattr(rate_limiter, "enabled", True)
+    monkeypatch.setattr(rate_limiter, "store", MemoryRateLimitStore(max_keys=100))
+
+    def set_limits(guest=None, user=None):
+        if guest is not None:
+            monkeypatch.setattr(settings, "GUEST_RATE_LIMIT_PER_MINUTE", guest)
+        if user is not None:
+            monkeypatch.setattr(settings, "RATE_LIMIT_PER_MINUTE", user)
+    return set_limits
+
+
+def test_guest_gets_429_with_retry_after_once_the_budget_is_spent(client, limits):
+    limits(guest=2)
+
+    for remaining in (1, 0):
+        response = client.post("/api/v1/chats/guest/message", json={"content": "Rate limited?"})
+        assert response.status_code == 201
+        assert response.headers["X-RateLimit-Limit"] == "2"
+        assert response.headers["X-RateLimit-Remaining"] == str(remaining)
+
+    response = client.post("/api/v1/chats/guest/message", json={"content": "Rate limited?"})
+    assert response.status_code == 429
+    # One token refills every 30 s at 2 per minute
+    assert 1 <= int(response.headers["Retry-After"]) <= 30
+
+
+def test_each_user_has_its_own_budget(client, auth_headers, chat_id, limits):
+    limits(user=1)
+    url = f"/api/v1/chats/{chat_id}/messages"
+
+    assert client.post(url, json={"content": "First"}, headers=auth_headers).status_code == 201
+    response = client.post(url, json={"content": "Second"}, headers=auth_headers)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+    other = client.post("/api/v1/users/register", json={
+        "name": "Other", "email": f"limits-{chat_id}@example.com", "password": "test-password",
+    }).json()["access_token"]
+    other_chat = client.post("/api/v1/chats", json={"title": "Other"}, headers={"Authorization": f"Bearer {other}"})
+    response = client.post(
+        f"/api/v1/chats/{other_chat.json()['id']}/messages",
+        json={"content": "Mine"},
+        headers={"Authorization": f"Bearer {other}"}
+    )
+    assert response.status_code == 201
+
+
+def test_stream_carries_rate_limit_headers_and_shares_the_budget(client, auth_headers, chat_id, limits):
+    limits(user=1)
+    url = f"/api/v1/chats/{chat_id}/messages/stream"
+
+    response = client.post(url, json={"content": "Stream"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["X-RateLimit-Limit"] == "1"
+    assert response.headers["X-RateLimit-Remaining"] == "0"
+
+    response = client.post(f"/api/v1/chats/{chat_id}/messages", json={"content": "Again"}, headers=auth_headers)
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
@@ -0,0 +1,90 @@
+"""
+ResponseCache: keys, TTL expiry, LRU eviction and the SQLite disk tier
+"""
+import asyncio
+
+from app.services.response_cache import ResponseCache
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_key_ignores_whitespace_but_not_case_model_or_config():
+    key = ResponseCache.make_key([{"role": "user", "content": "Hello  world "}], "model-a", {"temperature": 0.7})
+
+    assert key == ResponseCache.make_key([{"role": "user", "content": "Hello world"}], "model-a", {"temperature": 0.7})
+    assert key != ResponseCache.make_key([{"role": "user", "content": "hello world"}], "model-a", {"temperature": 0.7})
+    assert key != ResponseCache.make_key([{"role": "user", "content": "Hello world"}], "model-b", {"temperature": 0.7})
+    assert key != ResponseCache.make_key([{"role": "user", "content": "Hello world"}], "model-a", {"temperature": 0.2})
+
+
+def test_hit_and_miss_are_counted():
+    async def scenario():
+        cache = ResponseCache(max_entries=8, ttl_seconds=60)
+        assert await cache.get("k") is None
+        await cache.set("k", "v")
+        assert await cache.get("k") == "v"
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    run(scenario())
+
+
+def test_expired_entries_are_not_served():
+    async def scenario():
+        cache = ResponseCache(max_entries=8, ttl_seconds=0)
+        await cache.set("k", "v")
+        assert await cache.get("k") is None
+
+    run(scenario())
+
+
+def test_least_recently_used_entry_is_evicted():
+    async def scenario():
+        cache = ResponseCache(max_entries=2, ttl_seconds=60)
+        await cache.set("a", "1")
+        await cache.set("b", "2")
+        await cache.get("a")
+        await cache.set("c", "3")
+
+        assert await cache.get("a") == "1"
+        assert await cache.get("b") is None
+        assert await cache.get("c") == "3"
+
+    run(scenario())
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+
+    async def scenario():
+        await ResponseCache(max_entries=8, ttl_seconds=60, db_path=db_path).set("k", "v")
+
+        restarted = ResponseCache(max_entries=8, ttl_seconds=60, db_path=db_path)
+        assert await restarted.get("k") == "v"
+        assert restarted.stats()["persistent"] is True
+
+        await restarted.clear()
+        assert await ResponseCache(max_entries=8, ttl_seconds=60, db_path=db_path).get("k") is None
+
+    run(scenario())
+
+
+def test_expired_disk_entries_are_not_served(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+
+    async def scenario():
+        await ResponseCache(max_entries=8, ttl_seconds=0, db_path=db_path).set("k", "v")
+        assert await ResponseCache(max_entries=8, ttl_seconds=60, db_path=db_path).get("k") is None
+
+    run(scenario())
+
+
+def test_database_is_only_opened_on_first_use(tmp_path):
+    db_path = tmp_path / "cache.db"
+    cache = ResponseCache(max_entries=8, ttl_seconds=60, db_path=str(db_path))
+    assert not db_path.exists()
+
+    run(cache.set("k", "v"))
+    assert db_path.exists()
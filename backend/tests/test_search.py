@@ -0,0 +1,87 @@
+"""
+Full-text search: index sync on edits and deletes, and snippet escaping
+"""
+from app.models.message import Message
+
+
+def search_messages(client, auth_headers, q):
+    response = client.get("/api/v1/chats/search/messages", params={"q": q}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()["results"]
+
+
+def search_chat_ids(client, auth_headers, q):
+    response = client.get("/api/v1/chats/search/chats", params={"q": q}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return [chat["id"] for chat in response.json()["chats"]]
+
+
+def add_message(db, chat_id, content):
+    message = Message(chat_id=chat_id, role="user", content=content)
+    db.add(message)
+    db.commit()
+    return message
+
+
+def test_matches_are_highlighted(client, auth_headers, chat_id, db):
+    message = add_message(db, chat_id, "Photosynthesis turns light into chemical energy")
+
+    [hit] = search_messages(client, auth_headers, "photosynth")
+    assert hit["message_id"] == message.id
+    assert hit["chat_id"] == chat_id
+    assert "<mark>Photosynthesis</mark>" in hit["snippet"]
+    assert chat_id in search_chat_ids(client, auth_headers, "photosynthesis")
+
+
+def test_snippet_is_html_escaped(client, auth_headers, chat_id, db):
+    add_message(db, chat_id, "<script>alert('x')</script> mitochondria & <b>cells</b>")
+
+    [hit] = search_messages(client, auth_headers, "mitochondria")
+    assert "<script>" not in hit["snippet"]
+    assert "&lt;script&gt;" in hit["snippet"]
+    assert "&amp;" in hit["snippet"]
+    assert "<mark>mitochondria</mark>" in hit["snippet"]
+
+
+def test_edited_message_is_reindexed(client, auth_headers, chat_id, db):
+    message = add_message(db, chat_id, "The capital of Australia is Sydney")
+
+    message.content = "The capital of Australia is Canberra"
+    db.commit()
+
+    assert search_messages(client, auth_headers, "sydney") == []
+    assert [hit["message_id"] for hit in search_messages(client, auth_headers, "canberra")] == [message.id]
+
+
+def test_deleted_messages_leave_the_index(client, auth_headers, chat_id, db):
+    message = add_message(db, chat_id, "Ephemeral quokka fact")
+
+    db.delete(message)
+    db.commit()
+
+    assert search_messages(client, auth_headers, "quokka") == []
+
+
+def test_deleted_chat_leaves_the_index(client, auth_headers, chat_id, db):
+    add_message(db, chat_id, "Tardigrades survive in space")
+    assert client.delete(f"/api/v1/chats/{chat_id}", headers=auth_headers).status_code == 200
+
+    assert search_messages(client, auth_headers, "tardigrades") == []
+    assert search_chat_ids(client, auth_headers, "tardigrades") == []
+
+
+def test_renamed_chat_is_found_by_its_new_title(client, auth_headers, chat_id):
+    response = client.patch(f"/api/v1/chats/{chat_id}/title", json={"title": "Volcano revision"}, headers=auth_headers)
+    assert response.status_code == 200
+
+    assert search_chat_ids(client, auth_headers, "volcano") == [chat_id]
+    assert search_chat_ids(client, auth_headers, "test chat") == []
+
+
+def test_results_are_scoped_to_the_user(client, auth_headers, chat_id, db):
+    add_message(db, chat_id, "Private narwhal notes")
+    other = client.post("/api/v1/users/register", json={
+        "name": "Other", "email": f"other-{chat_id}@example.com", "password": "test-password",
+    }).json()["access_token"]
+
+    assert search_messages(client, {"Authorization": f"Bearer {other}"}, "narwhal") == []
@@ -0,0 +1,95 @@
+"""
+SSE message streaming: event sequence, persistence, and nothing saved on disconnect
+"""
+import asyncio
+import json
+
+from app.api.v1 import messages_routes
+
+
+def parse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def message_count(client, auth_headers, chat_id):
+    return client.get(f"/api/v1/chats/{chat_id}", headers=auth_headers).json()["message_count"]
+
+
+def test_stream_sends_chunks_then_done_and_persists_the_pair(client, auth_headers, chat_id):
+    response = client.post(
+        f"/api/v1/chats/{chat_id}/messages/stream", json={"content": "Stream this"}, headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    names = [name for name, _ in events]
+    assert names[-1] == "done"
+    assert set(names[:-1]) == {"chunk"}
+
+    chunks = "".join(data["content"] for name, data in events if name == "chunk")
+    pair = events[-1][1]
+    assert pair["user_message"]["content"] == "Stream this"
+    assert pair["assistant_message"]["content"] == chunks.strip()
+    assert message_count(client, auth_headers, chat_id) == 8
+
+
+def test_client_disconnect_mid_stream_persists_nothing(client, auth_headers, chat_id, monkeypatch):
+    async def slow_stream(conversation_history):
+        yield "partial"
+        await asyncio.sleep(30)
+        yield "never sent"
+
+    monkeypatch.setattr(messages_routes, "stream_ai_response", slow_stream)
+    body = json.dumps({"content": "Going away"}).encode()
+    first_chunk = None
+    sent = []
+
+    async def drive():
+        nonlocal first_chunk
+        first_chunk = asyncio.Event()
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await first_chunk.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+            if message["type"] == "http.response.body" and b"event: chunk" in message.get("body", b""):
+                first_chunk.set()
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": f"/api/v1/chats/{chat_id}/messages/stream",
+            "raw_path": f"/api/v1/chats/{chat_id}/messages/stream".encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"content-type", b"application/json"),
+                (b"authorization", auth_headers["Authorization"].encode()),
+            ],
+            "client": ("testclient", 50000),
+            "server": ("testserver", 80),
+        }
+        await asyncio.wait_for(client.app(scope, receive, send), timeout=10)
+
+    # Run on the app's own event loop, where its database connections live
+    client.portal.call(drive)
+
+    assert sent[0]["status"] == 200
+    assert not any(b"event: done" in message.get("body", b"") for message in sent)
+    assert message_count(client, auth_headers, chat_id) == 6
@@ -10,27 +10,39 @@ from datetime import datetime, timedelta
 # Add parent directory to path
 sys.path.append('.')
 
+from sqlalchemy import text
+
 from app.db.base import Base
 from app.db.session import engine , SessionLocal
+from app.db.migrations import run_migrations
 from app.models.user import User
 from app.models.chat import Chat
 from app.models.message import Message
 from app.core.security import get_password_hash
+from app.core.logging import setup_logging
 
 def init_db():
-    """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
+    """Initialize database tables (apply all migrations)"""
+    run_migrations()
     print("✓ Database tables created successfully!")
 
+# SQLite full-text search tables (migration 0006); not part of Base.metadata
+FTS_TABLES = ("messages_fts", "chats_fts")
+
 def drop_db():
     """Drop all database tables"""
     Base.metadata.drop_all(bind=engine)
+    with engine.begin() as connection:
+        if engine.dialect.name == "sqlite":
+            for table in FTS_TABLES:
+                connection.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
     print("✓ Database tables dropped successfully!")
 
 def reset_db():
     """Reset database (drop and recreate)"""
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
+    drop_db()
+    run_migrations()
     print("✓ Database reset successfully!")
 
 def seed_demo_data():
@@ -150,6 +162,8 @@ def list_users():
         db.close()
 
 if __name__ == '__main__':
+    setup_logging()
+    
     if len(sys.argv) < 2:
         print("\nDatabase Utility Commands:")
         print("  python db_utils.py init      - Initialize database")